@@ -1 +1 @@
-from .config import settings
+from .lazy import settings, current_account
@@ -1,3 +1,6 @@
+from typing import Literal
+
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -21,9 +24,91 @@ class Settings(BaseSettings):
     RANDOM_TAPS_COUNT: list[int] = [50, 200]
     SLEEP_BETWEEN_TAP: list[int] = [10, 25]
 
+    TAP_MODE: Literal['random', 'planned'] = 'random'
+    TAP_FILL_LEVEL: float = Field(default=0.9, gt=0, le=1)
+
     USE_PROXY_FROM_FILE: bool = False
     MAX_EARNING_TIME_HOURS: int = 4
     UPGRADE_MAX_RETURN_PERIOD_HOURS: int = 48
 
+    TASKS_CACHE_TTL: int = 3600
+    BOOSTS_CACHE_TTL: int = 3600
+    UPGRADES_CACHE_TTL: int = 3600
+
+    API_URL: str = 'https://api.hamsterkombat.io'
+
+    HTTP_POOL_LIMIT: int = 100
+    HTTP_DNS_CACHE_TTL: int = 300
+    HTTP_KEEPALIVE_TIMEOUT: int = 60
+    USE_ORJSON: bool = True
+
+    MAX_REQUESTS_PER_SECOND: float = 30
+    MAX_REQUESTS_PER_SECOND_PER_HOST: float = 30
+    MAX_REQUESTS_PER_SECOND_PER_PROXY: float = 3
+
+    PROXY_CHECK_URL: str = ''
+    PROXY_CHECK_TIMEOUT: float = 5
+    PROXY_CHECK_INTERVAL: int = 300
+    PROXY_CHECK_CONCURRENCY: int = 50
+    PROXY_STATS_WINDOW: int = 50
+    PROXY_MIN_SAMPLES: int = 5
+    PROXY_MAX_ERROR_RATE: float = 0.3
+    PROXY_MAX_LATENCY: float = 5
+
+    RETRY_MAX_ATTEMPTS: int = 3
+    RETRY_BASE_DELAY: float = 1
+    RETRY_MAX_DELAY: float = 60
+    BREAKER_FAILURE_THRESHOLD: int = 20
+    BREAKER_OPEN_TIME: float = 30
+
+    ACCOUNT_WORKERS: int = 0
+    WORKERS_STATUS_INTERVAL: int = 60
+
+    METRICS_HOST: str = '127.0.0.1'
+    METRICS_PORT: int = 0
+    CONTROL_HOST: str = '127.0.0.1'
+    CONTROL_PORT: int = 0
+
+    PROFILE_DIR: str = 'profiles'
+    PROFILE_DURATION: float = 30
+    PROFILE_SLOW_CALLBACK: float = 0.1
+    PROFILE_TOP: int = 20
+    PROFILE_STACK_DEPTH: int = 10
+    PROFILE_TRACEMALLOC_FRAMES: int = 1
+
+    LOG_MODE: Literal['sync', 'async'] = 'sync'
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_BATCH_SIZE: int = 100
+    LOG_JSON_FILE: str = ''
+    LOG_SAMPLE_EVERY: int = 1
+    LOG_SAMPLE_MAX_LEVEL: str = 'SUCCESS'
+    LOG_SAMPLED_MESSAGES: list[str] = ['Successful tapped', 'Sleep ']
+
+    AUTH_CACHE_PATH: str = 'sessions/auth_cache.sqlite3'
+    TG_WEB_DATA_TTL: int = 3600
+    ACCESS_TOKEN_TTL: int = 3600
+    AUTH_REFRESH_MARGIN: int = 300
+    AUTH_REFRESH_SPREAD: int = 900
+    TG_MAX_CONNECTIONS: int = 20
+    TG_IDLE_CONNECTIONS: int = 5
+    TG_IDLE_TIMEOUT: int = 60
+
+    CHECKPOINT_PATH: str = 'sessions/checkpoints.sqlite3'
+    CHECKPOINT_INTERVAL: int = 60
+    CHECKPOINT_MAX_AGE: int = 3600
+
+    STARTUP_CONCURRENCY: int = 20
+    STARTUP_RAMP_RATE: float = 5
+    STARTUP_TIMEOUT: int = 120
+
+    SETTINGS_WATCH_INTERVAL: float = 5
+    ACCOUNT_SETTINGS_DIR: str = 'bot/config/accounts'
+    SESSIONS_WATCH_INTERVAL: float = 10
 
-settings = Settings()
+    SESSION_PREFLIGHT: bool = True
+    SESSIONS_REPORT_PATH: str = 'sessions/report.json'
+    SESSIONS_QUARANTINE_DIR: str = 'sessions/quarantine'
+    SESSION_CHECK_MAX_AGE: int = 86400
+    SESSION_CHECK_CONCURRENCY: int = 10
+    SESSION_CHECK_TIMEOUT: int = 30
+    REGISTRATION_CONCURRENCY: int = 3
@@ -0,0 +1,81 @@
+import os
+import glob
+from contextvars import ContextVar
+
+from bot.profiling import startup
+
+ENV_FILE = '.env'
+
+current_account: ContextVar[str | None] = ContextVar('current_account', default=None)
+
+
+class LazySettings:
+    def __init__(self):
+        object.__setattr__(self, '_settings', None)
+        object.__setattr__(self, '_overrides', {})
+        object.__setattr__(self, '_version', 0)
+
+    def _load(self):
+        if self._settings is None:
+            from .config import Settings
+
+            object.__setattr__(self, '_settings', Settings())
+            object.__setattr__(self, '_overrides', self._load_overrides(settings=self._settings))
+            startup.mark(name='settings loaded')
+
+        return self._settings
+
+    @staticmethod
+    def _load_overrides(settings) -> dict:
+        if not settings.ACCOUNT_SETTINGS_DIR:
+            return {}
+
+        return {os.path.splitext(os.path.basename(path))[0]: type(settings)(_env_file=(ENV_FILE, path))
+                for path in sorted(glob.glob(os.path.join(settings.ACCOUNT_SETTINGS_DIR, '*.env')))}
+
+    def watched_files(self) -> list[str]:
+        settings = self._load()
+        paths = [ENV_FILE]
+
+        if settings.ACCOUNT_SETTINGS_DIR:
+            paths += sorted(glob.glob(os.path.join(settings.ACCOUNT_SETTINGS_DIR, '*.env')))
+
+        return paths
+
+    @property
+    def overrides(self) -> list[str]:
+        self._load()
+
+        return list(self._overrides)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def reload(self) -> list[str]:
+        from .config import Settings
+
+        previous = self._load()
+        settings = Settings()
+        overrides = self._load_overrides(settings=settings)
+
+        object.__setattr__(self, '_settings', settings)
+        object.__setattr__(self, '_overrides', overrides)
+        object.__setattr__(self, '_version', self._version + 1)
+
+        return [name for name, value in settings.model_dump().items() if getattr(previous, name) != value]
+
+    def __getattr__(self, name: str):
+        settings = self._load()
+        session_name = current_account.get()
+
+        if session_name is not None:
+            settings = self._overrides.get(session_name, settings)
+
+        return getattr(settings, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._load(), name, value)
+
+
+settings = LazySettings()
@@ -0,0 +1,80 @@
+import os
+import sqlite3
+from dataclasses import dataclass
+from time import time
+
+
+@dataclass
+class AuthEntry:
+    session_name: str
+    peer_id: int | None = None
+    peer_access_hash: int | None = None
+    tg_web_data: str | None = None
+    tg_web_data_expires_at: float = 0
+    access_token: str | None = None
+    access_token_expires_at: float = 0
+
+    @property
+    def has_valid_tg_web_data(self) -> bool:
+        return bool(self.tg_web_data) and self.tg_web_data_expires_at > time()
+
+    @property
+    def has_valid_access_token(self) -> bool:
+        return bool(self.access_token) and self.access_token_expires_at > time()
+
+
+class AuthCache:
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS auth_cache (
+                session_name TEXT PRIMARY KEY,
+                peer_id INTEGER,
+                peer_access_hash INTEGER,
+                tg_web_data TEXT,
+                tg_web_data_expires_at REAL NOT NULL DEFAULT 0,
+                access_token TEXT,
+                access_token_expires_at REAL NOT NULL DEFAULT 0
+            )
+        """)
+
+    def get(self, session_name: str) -> AuthEntry:
+        row = self._connection.execute(
+            'SELECT peer_id, peer_access_hash, tg_web_data, tg_web_data_expires_at, '
+            'access_token, access_token_expires_at FROM auth_cache WHERE session_name = ?',
+            (session_name,)).fetchone()
+
+        if row is None:
+            return AuthEntry(session_name=session_name)
+
+        return AuthEntry(session_name, *row)
+
+    def _update(self, session_name: str, **fields) -> None:
+        columns = ', '.join(fields)
+        placeholders = ', '.join('?' for _ in fields)
+        updates = ', '.join(f'{column} = excluded.{column}' for column in fields)
+
+        self._connection.execute(
+            f'INSERT INTO auth_cache (session_name, {columns}) VALUES (?, {placeholders}) '
+            f'ON CONFLICT (session_name) DO UPDATE SET {updates}',
+            (session_name, *fields.values()))
+
+    def set_peer(self, session_name: str, peer_id: int, peer_access_hash: int) -> None:
+        self._update(session_name, peer_id=peer_id, peer_access_hash=peer_access_hash)
+
+    def set_tg_web_data(self, session_name: str, tg_web_data: str, expires_at: float) -> None:
+        self._update(session_name, tg_web_data=tg_web_data, tg_web_data_expires_at=expires_at)
+
+    def set_access_token(self, session_name: str, access_token: str, expires_at: float) -> None:
+        self._update(session_name, access_token=access_token, access_token_expires_at=expires_at)
+
+    def invalidate(self, session_name: str) -> None:
+        self._update(session_name, tg_web_data=None, tg_web_data_expires_at=0,
+                     access_token=None, access_token_expires_at=0)
+
+    def close(self) -> None:
+        self._connection.close()
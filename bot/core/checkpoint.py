@@ -0,0 +1,67 @@
+import os
+import asyncio
+import sqlite3
+from time import time
+from typing import Iterable
+
+from bot.utils import logger, serializer
+from .tapper import Tapper
+
+
+class CheckpointStore:
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                session_name TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                saved_at REAL NOT NULL
+            )
+        """)
+
+    def load_all(self, max_age: float) -> dict[str, dict]:
+        rows = self._connection.execute('SELECT session_name, data FROM checkpoints WHERE saved_at >= ?',
+                                        (time() - max_age,)).fetchall()
+
+        return {session_name: serializer.loads(data) for session_name, data in rows}
+
+    def save_many(self, checkpoints: dict[str, dict]) -> None:
+        saved_at = time()
+
+        self._connection.execute('BEGIN')
+        try:
+            self._connection.executemany(
+                'INSERT INTO checkpoints (session_name, data, saved_at) VALUES (?, ?, ?) '
+                'ON CONFLICT (session_name) DO UPDATE SET data = excluded.data, saved_at = excluded.saved_at',
+                [(session_name, serializer.dumps(checkpoint), saved_at)
+                 for session_name, checkpoint in checkpoints.items()])
+        except Exception:
+            self._connection.execute('ROLLBACK')
+            raise
+        else:
+            self._connection.execute('COMMIT')
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class Checkpointer:
+    def __init__(self, store: CheckpointStore, tappers: Iterable[Tapper], interval: float):
+        self.store = store
+        self.tappers = tappers
+        self.interval = interval
+
+    def save(self) -> None:
+        try:
+            self.store.save_many({tapper.session_name: tapper.checkpoint() for tapper in self.tappers})
+        except Exception as error:
+            logger.error(f"Unknown error while saving checkpoints: {error}")
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(delay=self.interval)
+            self.save()
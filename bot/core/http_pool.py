@@ -0,0 +1,47 @@
+import aiohttp
+from aiohttp_proxy import ProxyConnector
+
+from bot.config import settings
+from .headers import headers
+
+
+class HttpClientPool:
+    def __init__(self, trace_configs: list[aiohttp.TraceConfig] | None = None):
+        self._sessions: dict[str | None, aiohttp.ClientSession] = {}
+        self._trace_configs = trace_configs
+
+    @staticmethod
+    def _create_connector(proxy: str | None) -> aiohttp.TCPConnector:
+        connector_options = dict(
+            limit=settings.HTTP_POOL_LIMIT,
+            ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT
+        )
+
+        if proxy:
+            return ProxyConnector.from_url(proxy, **connector_options)
+
+        return aiohttp.TCPConnector(**connector_options)
+
+    def get(self, proxy: str | None) -> aiohttp.ClientSession:
+        http_client = self._sessions.get(proxy)
+
+        if http_client is None or http_client.closed:
+            http_client = aiohttp.ClientSession(headers=headers, connector=self._create_connector(proxy=proxy),
+                                                trace_configs=self._trace_configs)
+            self._sessions[proxy] = http_client
+
+        return http_client
+
+    async def close(self) -> None:
+        for http_client in self._sessions.values():
+            if not http_client.closed:
+                await http_client.close()
+
+        self._sessions.clear()
+
+    async def __aenter__(self) -> 'HttpClientPool':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
@@ -0,0 +1,63 @@
+from time import time
+
+from bot.config import settings
+from .profile import ProfileState
+
+
+def get_tap_count(available_energy: int, taps: int, earn_per_tap: int) -> int:
+    if taps > available_energy:
+        taps = available_energy
+
+    if available_energy - taps / earn_per_tap - 1 < settings.MIN_AVAILABLE_ENERGY:
+        taps = available_energy - settings.MIN_AVAILABLE_ENERGY
+        if taps < 1:
+            taps = 1
+
+    return max(int(taps / earn_per_tap - 1), 1)
+
+
+def get_energy_boost(boosts: list[dict]) -> dict | None:
+    for item in boosts:
+        if item.get("id") == "BoostFullAvailableTaps":
+            return item
+
+    return None
+
+
+class TapPlanner:
+    def __init__(self):
+        self.available_taps = 0
+        self.max_taps = 0
+        self.taps_recover_per_sec = 0
+        self.earn_per_tap = 1
+        self.updated_at = 0.
+
+    def update(self, profile: ProfileState) -> None:
+        self.available_taps = profile.available_taps
+        self.max_taps = profile.max_taps
+        self.taps_recover_per_sec = profile.taps_recover_per_sec
+        self.earn_per_tap = profile.earn_per_tap
+        self.updated_at = time()
+
+    def energy(self, now: float | None = None) -> int:
+        elapsed = (now or time()) - self.updated_at
+        energy = self.available_taps + elapsed * self.taps_recover_per_sec
+
+        return int(min(energy, self.max_taps))
+
+    def delay(self, now: float | None = None) -> float:
+        if self.taps_recover_per_sec <= 0:
+            return settings.SLEEP_BY_MIN_ENERGY
+
+        min_energy = settings.MIN_AVAILABLE_ENERGY + self.earn_per_tap
+        target_energy = self.max_taps * settings.TAP_FILL_LEVEL
+
+        if target_energy <= min_energy:
+            target_energy = self.max_taps
+
+        if target_energy <= min_energy:
+            return settings.SLEEP_BY_MIN_ENERGY
+
+        missing_energy = target_energy - self.energy(now=now)
+
+        return max(missing_energy / self.taps_recover_per_sec, settings.SLEEP_BETWEEN_TAP[0])
@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class ProfileState:
+    balance: int
+    total: int
+    available_taps: int
+    max_taps: int
+    taps_recover_per_sec: int
+    earn_per_tap: int
+    earn_passive_per_hour: float
+    last_passive_earn: int
+    exchange_id: str | None
+    energy_boost_time: int
+    energy_boost_level: int
+
+    @property
+    def hourly_earnings(self) -> float:
+        return 3600 * self.taps_recover_per_sec + self.earn_passive_per_hour
+
+    @classmethod
+    def from_dict(cls, profile_data: dict[str]) -> 'ProfileState':
+        energy_boost = profile_data.get('boosts', {}).get('BoostFullAvailableTaps', {})
+
+        return cls(balance=int(profile_data['balanceCoins']),
+                   total=int(profile_data['totalCoins']),
+                   available_taps=profile_data['availableTaps'],
+                   max_taps=profile_data['maxTaps'],
+                   taps_recover_per_sec=profile_data['tapsRecoverPerSec'],
+                   earn_per_tap=profile_data['earnPerTap'],
+                   earn_passive_per_hour=profile_data['earnPassivePerHour'],
+                   last_passive_earn=int(profile_data.get('lastPassiveEarn', 0)),
+                   exchange_id=profile_data.get('exchangeId'),
+                   energy_boost_time=energy_boost.get('lastUpgradeAt', 0),
+                   energy_boost_level=energy_boost.get('level', 0))
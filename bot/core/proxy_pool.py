@@ -0,0 +1,181 @@
+import asyncio
+from collections import deque
+from statistics import median
+from time import monotonic
+
+import aiohttp
+from better_proxy import Proxy
+
+from bot.config import settings
+from bot.utils import logger
+from .http_pool import HttpClientPool
+
+
+def format_proxy(proxy: str | None) -> str:
+    if not proxy:
+        return 'direct'
+
+    proxy = Proxy.from_str(proxy=proxy)
+
+    return f'{proxy.protocol}://{proxy.host}:{proxy.port}'
+
+
+class ProxyStats:
+    __slots__ = ('latencies', 'results', 'accounts')
+
+    def __init__(self, window: int):
+        self.latencies = deque(maxlen=window)
+        self.results = deque(maxlen=window)
+        self.accounts = 0
+
+    @property
+    def latency(self) -> float | None:
+        return median(self.latencies) if self.latencies else None
+
+    @property
+    def error_rate(self) -> float:
+        return self.results.count(False) / len(self.results) if self.results else 0.
+
+    @property
+    def degraded(self) -> bool:
+        if len(self.results) < settings.PROXY_MIN_SAMPLES:
+            return bool(self.results) and not any(self.results)
+
+        return (self.error_rate > settings.PROXY_MAX_ERROR_RATE
+                or (self.latency or 0) > settings.PROXY_MAX_LATENCY)
+
+
+class ProxyPool:
+    def __init__(self, proxies: list[str | None], http_pool: HttpClientPool):
+        self.http_pool = http_pool
+
+        self._stats = {proxy: ProxyStats(window=settings.PROXY_STATS_WINDOW)
+                       for proxy in dict.fromkeys(proxy for proxy in proxies if proxy)}
+        self._assignments: dict[str, str] = {}
+        self._monitor: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def record(self, proxy: str | None, latency: float, ok: bool) -> None:
+        stats = self._stats.get(proxy)
+
+        if stats is None:
+            return
+
+        stats.results.append(ok)
+        if ok:
+            stats.latencies.append(latency)
+
+    async def probe(self, proxy: str, semaphore: asyncio.Semaphore) -> None:
+        url = settings.PROXY_CHECK_URL or settings.API_URL
+
+        async with semaphore:
+            started_at = monotonic()
+
+            try:
+                async with self.http_pool.get(proxy=proxy).get(
+                        url=url, timeout=aiohttp.ClientTimeout(total=settings.PROXY_CHECK_TIMEOUT)) as response:
+                    ok = response.status < 500
+            except Exception as error:
+                logger.debug(f"Proxy: {format_proxy(proxy)} | Health check error: {error}")
+                ok = False
+
+            self.record(proxy=proxy, latency=monotonic() - started_at, ok=ok)
+
+    async def probe_all(self) -> None:
+        semaphore = asyncio.Semaphore(settings.PROXY_CHECK_CONCURRENCY)
+
+        await asyncio.gather(*(self.probe(proxy=proxy, semaphore=semaphore) for proxy in self._stats))
+
+    def _select(self, exclude: str | None = None) -> str | None:
+        candidates = [(proxy, stats) for proxy, stats in self._stats.items() if proxy != exclude]
+
+        if not candidates:
+            return None
+
+        healthy = [(proxy, stats) for proxy, stats in candidates if not stats.degraded]
+
+        if healthy:
+            return min(healthy, key=lambda item: (item[1].accounts, item[1].latency or 0))[0]
+
+        if exclude is not None:
+            return None
+
+        return min(candidates, key=lambda item: (item[1].error_rate, item[1].accounts))[0]
+
+    def _move(self, session_name: str, proxy: str | None) -> None:
+        previous = self._assignments.pop(session_name, None)
+
+        if previous is not None:
+            self._stats[previous].accounts -= 1
+
+        if proxy is not None:
+            self._assignments[session_name] = proxy
+            self._stats[proxy].accounts += 1
+
+    def assign(self, session_name: str) -> str | None:
+        proxy = self._assignments.get(session_name)
+
+        if proxy is None:
+            proxy = self._select()
+            self._move(session_name=session_name, proxy=proxy)
+
+        return proxy
+
+    def release(self, session_name: str) -> None:
+        self._move(session_name=session_name, proxy=None)
+
+    def reassign(self, session_name: str, proxy: str | None) -> str | None:
+        stats = self._stats.get(proxy)
+
+        if stats is None or not stats.degraded:
+            return proxy
+
+        new_proxy = self._select(exclude=proxy)
+
+        if new_proxy is None:
+            return proxy
+
+        self._move(session_name=session_name, proxy=new_proxy)
+
+        logger.warning(f"{session_name} | Proxy {format_proxy(proxy)} degraded "
+                       f"(errors: {self._stats[proxy].error_rate:.0%}), switched to {format_proxy(new_proxy)}")
+
+        return new_proxy
+
+    def summary(self) -> None:
+        if not self._stats:
+            return
+
+        rows = [f"{'Proxy':<40} {'Status':<9} {'Latency':>9} {'Errors':>7} {'Accounts':>9}"]
+
+        for proxy, stats in sorted(self._stats.items(), key=lambda item: item[1].latency or float('inf')):
+            latency = f'{stats.latency * 1000:.0f} ms' if stats.latency is not None else '-'
+            status = 'degraded' if stats.degraded else 'ok'
+
+            rows.append(f"{format_proxy(proxy):<40} {status:<9} {latency:>9} {stats.error_rate:>7.0%} "
+                        f"{stats.accounts:>9}")
+
+        healthy = sum(not stats.degraded for stats in self._stats.values())
+
+        logger.info(f"Proxy health: {healthy}/{len(self._stats)} healthy\n" + '\n'.join(rows))
+
+    async def _check_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(delay=settings.PROXY_CHECK_INTERVAL)
+            await self.probe_all()
+
+    async def start(self) -> None:
+        if not self._stats:
+            return
+
+        await self.probe_all()
+
+        if settings.PROXY_CHECK_INTERVAL > 0:
+            self._monitor = asyncio.create_task(self._check_periodically())
+
+    def close(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
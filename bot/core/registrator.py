@@ -1,7 +1,78 @@
+import os
+import asyncio
+import sqlite3
+from itertools import cycle
+from contextlib import suppress
+from dataclasses import dataclass
+
 from pyrogram import Client
+from pyrogram.errors import Unauthorized, SessionPasswordNeeded
+from pyrogram.types import User
 
 from bot.config import settings
 from bot.utils import logger
+from .sessions import SessionReport, get_session_path
+from .tg_client import get_proxy_dict
+
+
+@dataclass(slots=True)
+class ManifestEntry:
+    session_name: str
+    phone_number: str
+    password: str | None = None
+
+
+def read_manifest(path: str) -> list[ManifestEntry]:
+    entries = []
+
+    with open(path, encoding='utf-8-sig') as file:
+        for line_number, row in enumerate(file, start=1):
+            row = row.strip()
+
+            if not row or row.startswith('#'):
+                continue
+
+            session_name, _, row = row.partition(':')
+            phone_number, _, password = row.partition(':')
+            session_name = session_name.strip()
+            phone_number = phone_number.strip()
+
+            if not session_name or not phone_number:
+                logger.warning(f"{path}:{line_number} | Malformed manifest row, "
+                               f"expected session_name:phone_number[:password]. Skipping...")
+                continue
+
+            entries.append(ManifestEntry(session_name=session_name, phone_number=phone_number,
+                                         password=password or None))
+
+    return entries
+
+
+def create_client(session_name: str, proxy: str | None = None) -> Client:
+    return Client(
+        name=session_name,
+        api_id=settings.API_ID,
+        api_hash=settings.API_HASH,
+        workdir="sessions/",
+        proxy=get_proxy_dict(proxy=proxy),
+        no_updates=True
+    )
+
+
+async def close_client(client: Client) -> None:
+    if client.is_connected:
+        await client.disconnect()
+    else:
+        with suppress(Exception):
+            await client.storage.close()
+
+
+def format_error(error: Exception) -> str:
+    return f'{type(error).__name__}: {error}' if str(error) else type(error).__name__
+
+
+def format_user(user: User) -> str:
+    return f'@{user.username} | {user.first_name} {user.last_name}'
 
 
 async def register_sessions() -> None:
@@ -27,3 +98,120 @@ async def register_sessions() -> None:
         user_data = await session.get_me()
 
     logger.success(f'Session added successfully @{user_data.username} | {user_data.first_name} {user_data.last_name}')
+
+
+class BatchRegistrator:
+    def __init__(self, report: SessionReport, proxies: list[str]):
+        self.report = report
+
+        self._proxies = cycle(proxies) if proxies else None
+        self._prompt_lock = asyncio.Lock()
+
+    def next_proxy(self) -> str | None:
+        return next(self._proxies) if self._proxies else None
+
+    async def prompt(self, text: str) -> str:
+        async with self._prompt_lock:
+            return (await asyncio.to_thread(input, text)).strip()
+
+    async def get_user(self, client: Client) -> User | None:
+        if not await client.connect():
+            return None
+
+        return await client.get_me()
+
+    async def validate(self, session_name: str, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            client = create_client(session_name=session_name, proxy=self.next_proxy())
+
+            try:
+                user = await asyncio.wait_for(self.get_user(client=client), timeout=settings.SESSION_CHECK_TIMEOUT)
+            except Unauthorized as error:
+                self.report.set(session_name=session_name, status='invalid', reason=error.MESSAGE)
+            except sqlite3.DatabaseError as error:
+                self.report.set(session_name=session_name, status='invalid', reason=f'Corrupted session file: {error}')
+            except asyncio.TimeoutError:
+                self.report.set(session_name=session_name, status='unknown', reason='Timed out')
+            except Exception as error:
+                self.report.set(session_name=session_name, status='unknown', reason=format_error(error=error))
+            else:
+                if user is None:
+                    self.report.set(session_name=session_name, status='invalid', reason='Not authorized')
+                else:
+                    self.report.set(session_name=session_name, status='valid', user=format_user(user=user))
+            finally:
+                await close_client(client=client)
+
+    async def sign_in(self, client: Client, entry: ManifestEntry) -> User:
+        sent_code = await client.send_code(phone_number=entry.phone_number)
+        phone_code = await self.prompt(f'{entry.session_name} | Enter the code sent to {entry.phone_number}: ')
+
+        try:
+            user = await client.sign_in(phone_number=entry.phone_number, phone_code_hash=sent_code.phone_code_hash,
+                                        phone_code=phone_code)
+        except SessionPasswordNeeded:
+            password = entry.password or await self.prompt(f'{entry.session_name} | Enter the 2FA password: ')
+            user = await client.check_password(password=password)
+
+        if not isinstance(user, User):
+            raise ValueError(f"Phone number {entry.phone_number} is not registered in Telegram")
+
+        return user
+
+    async def register(self, entry: ManifestEntry, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            client = create_client(session_name=entry.session_name, proxy=self.next_proxy())
+
+            try:
+                await client.connect()
+                user = await self.sign_in(client=client, entry=entry)
+            except Exception as error:
+                logger.error(f"{entry.session_name} | Registration failed: {format_error(error=error)}")
+                self.report.set(session_name=entry.session_name, status='invalid',
+                                reason=f'Registration failed: {format_error(error=error)}')
+
+                await close_client(client=client)
+
+                with suppress(OSError):
+                    os.remove(get_session_path(session_name=entry.session_name))
+            else:
+                logger.success(f"{entry.session_name} | Session added successfully {format_user(user=user)}")
+                self.report.set(session_name=entry.session_name, status='valid', user=format_user(user=user))
+
+                await close_client(client=client)
+
+    async def validate_all(self, session_names: list[str]) -> None:
+        semaphore = asyncio.Semaphore(settings.SESSION_CHECK_CONCURRENCY)
+
+        await asyncio.gather(*(self.validate(session_name=session_name, semaphore=semaphore)
+                               for session_name in session_names))
+
+    async def register_all(self, entries: list[ManifestEntry]) -> None:
+        semaphore = asyncio.Semaphore(settings.REGISTRATION_CONCURRENCY)
+
+        await asyncio.gather(*(self.register(entry=entry, semaphore=semaphore) for entry in entries))
+
+
+async def check_sessions(session_names: list[str], proxies: list[str],
+                         manifest_path: str | None = None) -> None:
+    if not settings.API_ID or not settings.API_HASH:
+        raise ValueError("API_ID and API_HASH not found in the .env file.")
+
+    report = SessionReport(path=settings.SESSIONS_REPORT_PATH)
+    registrator = BatchRegistrator(report=report, proxies=proxies)
+
+    await registrator.validate_all(session_names=session_names)
+
+    if manifest_path:
+        entries = read_manifest(path=manifest_path)
+        new_entries = [entry for entry in entries if entry.session_name not in session_names]
+
+        logger.info(f"Manifest: {len(entries)} sessions | Already exist: {len(entries) - len(new_entries)} "
+                    f"| To register: {len(new_entries)}")
+
+        await registrator.register_all(entries=new_entries)
+
+        session_names = session_names + [entry.session_name for entry in new_entries]
+
+    report.save()
+    report.summary(session_names=session_names)
@@ -0,0 +1,46 @@
+from collections import Counter
+from time import time
+from typing import Any
+
+from bot.utils.metrics import metrics
+
+
+class ResponseCache:
+    def __init__(self, ttls: dict[str, float]):
+        self.ttls = ttls
+
+        self._entries: dict[str, tuple[float, Any]] = {}
+
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def is_fresh(self, key: str) -> bool:
+        entry = self._entries.get(key)
+
+        return entry is not None and entry[0] > time()
+
+    def get(self, key: str) -> Any | None:
+        if self.is_fresh(key):
+            self.hits[key] += 1
+            metrics.cache_requests.inc(key, 'hit')
+
+            return self._entries[key][1]
+
+        self.misses[key] += 1
+        metrics.cache_requests.inc(key, 'miss')
+
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time() + self.ttls.get(key, 0), value)
+
+    def invalidate(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def snapshot(self) -> dict[str, tuple[float, Any]]:
+        return {key: entry for key, entry in self._entries.items() if entry[0] > time()}
+
+    def restore(self, entries: dict[str, list]) -> None:
+        for key, (expires_at, value) in entries.items():
+            if expires_at > time():
+                self._entries[key] = (expires_at, value)
@@ -0,0 +1,158 @@
+import asyncio
+from contextlib import suppress
+from random import uniform
+from time import monotonic
+from typing import Awaitable, Callable, TypeVar
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from bot.config import settings
+from bot.utils import logger
+from bot.utils.metrics import metrics
+
+T = TypeVar('T')
+
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+def backoff_delay(attempt: int) -> float:
+    delay = min(settings.RETRY_MAX_DELAY, settings.RETRY_BASE_DELAY * 2 ** min(attempt, 32))
+
+    return delay / 2 + uniform(0, delay / 2)
+
+
+def retry_after(error: aiohttp.ClientResponseError) -> float | None:
+    if not error.headers:
+        return None
+
+    try:
+        return max(float(error.headers.get('Retry-After', '')), 0)
+    except ValueError:
+        return None
+
+
+class CircuitBreaker:
+    def __init__(self, host: str, failure_threshold: int, open_time: float):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.open_time = open_time
+
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.resume_at = 0.0
+
+        self._probing = False
+        self._closed = asyncio.Event()
+        self._closed.set()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    async def wait(self) -> bool:
+        delay = self.resume_at - monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay=delay)
+
+        while self.opened_at is not None:
+            remaining = self.opened_at + self.open_time - monotonic()
+
+            if remaining <= 0 and not self._probing:
+                self._probing = True
+                return True
+
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._closed.wait(), timeout=remaining if remaining > 0 else 1)
+
+        return False
+
+    def record_success(self, probe: bool) -> None:
+        if self.opened_at is not None and not probe:
+            return
+
+        self.failures = 0
+
+        if self.opened_at is not None:
+            logger.info(f"{self.host} | Circuit breaker closed")
+
+            self.opened_at = None
+            self._probing = False
+            self._closed.set()
+            metrics.circuit_open.set(self.host, value=0)
+
+    def record_failure(self, probe: bool) -> None:
+        self.failures += 1
+
+        if probe or (self.opened_at is None and self.failures >= self.failure_threshold):
+            if self.opened_at is None:
+                logger.warning(f"{self.host} | Circuit breaker opened for {self.open_time}s "
+                               f"after {self.failures} failures")
+
+            self.opened_at = monotonic()
+            self._probing = False
+            self._closed.clear()
+            metrics.circuit_open.set(self.host, value=1)
+
+    def hold(self, delay: float) -> None:
+        self.resume_at = max(self.resume_at, monotonic() + min(delay, settings.RETRY_MAX_DELAY))
+
+    def release_probe(self) -> None:
+        self._probing = False
+
+
+class RetryPolicy:
+    def __init__(self):
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        host = urlsplit(url).hostname
+
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(host=host,
+                                                            failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+                                                            open_time=settings.BREAKER_OPEN_TIME)
+
+        return breaker
+
+    async def call(self, url: str, request: Callable[[], Awaitable[T]], idempotent: bool = False) -> T:
+        breaker = self.breaker(url=url)
+        attempts = max(settings.RETRY_MAX_ATTEMPTS, 1)
+
+        for attempt in range(attempts):
+            probe = await breaker.wait()
+
+            try:
+                result = await request()
+            except aiohttp.ClientResponseError as error:
+                if error.status not in RETRYABLE_STATUSES:
+                    breaker.record_success(probe=probe)
+                    raise
+
+                breaker.record_failure(probe=probe)
+
+                if attempt == attempts - 1 or (not idempotent and error.status != 429):
+                    raise
+
+                delay = retry_after(error)
+                if delay is None:
+                    delay = backoff_delay(attempt=attempt)
+                elif error.status == 429:
+                    breaker.hold(delay=delay)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                breaker.record_failure(probe=probe)
+
+                if attempt == attempts - 1 or (not idempotent and not isinstance(error, aiohttp.ClientConnectorError)):
+                    raise
+
+                delay = backoff_delay(attempt=attempt)
+            else:
+                breaker.record_success(probe=probe)
+
+                return result
+            finally:
+                if probe:
+                    breaker.release_probe()
+
+            await asyncio.sleep(delay=min(delay, settings.RETRY_MAX_DELAY))
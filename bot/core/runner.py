@@ -0,0 +1,65 @@
+import asyncio
+
+from bot.utils import logger
+from bot.exceptions import InvalidSession
+from .scheduler import Scheduler
+from .startup import StartupPipeline
+from .tapper import Tapper
+
+
+class AccountRunner:
+    def __init__(self, scheduler: Scheduler, startup: StartupPipeline, workers: int):
+        self.scheduler = scheduler
+        self.startup = startup
+        self.workers = workers
+
+        self.active = 0
+        self._finished = asyncio.Event()
+
+    async def start_account(self, tapper: Tapper, proxy: str | None) -> None:
+        try:
+            await self.startup.acquire(session_name=tapper.session_name)
+            delay = tapper.prepare(proxy=proxy)
+        except Exception as error:
+            logger.error(f"{tapper.session_name} | Unknown error while starting: {error}")
+            self.stop_account(tapper=tapper)
+            return
+
+        self.scheduler.schedule(session_name=tapper.session_name, item=tapper, delay=delay)
+
+    def stop_account(self, tapper: Tapper) -> None:
+        self.startup.release(session_name=tapper.session_name, ready=False)
+
+        self.active -= 1
+        if self.active <= 0:
+            self._finished.set()
+
+    async def work(self) -> None:
+        while True:
+            tapper: Tapper = await self.scheduler.ready()
+
+            try:
+                delay = await tapper.step()
+            except InvalidSession:
+                logger.error(f"{tapper.session_name} | Invalid Session")
+                self.stop_account(tapper=tapper)
+                continue
+
+            self.scheduler.schedule(session_name=tapper.session_name, item=tapper, delay=delay)
+
+    async def run(self, accounts: list[tuple[Tapper, str | None]]) -> None:
+        self.active = len(accounts)
+
+        if not accounts:
+            return
+
+        starters = [asyncio.create_task(self.start_account(tapper=tapper, proxy=proxy)) for tapper, proxy in accounts]
+        workers = [asyncio.create_task(self.work()) for _ in range(self.workers)]
+
+        try:
+            await self._finished.wait()
+        finally:
+            for task in starters + workers:
+                task.cancel()
+
+            await asyncio.gather(*starters, *workers, return_exceptions=True)
@@ -0,0 +1,145 @@
+import asyncio
+import heapq
+from contextlib import suppress
+from itertools import count
+from time import monotonic
+from urllib.parse import urlsplit
+
+from bot.config import settings
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self._tokens = self.capacity
+        self._updated_at = monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+
+        async with self._lock:
+            self._refill()
+
+            if self._tokens < 1:
+                await asyncio.sleep(delay=(1 - self._tokens) / self.rate)
+                self._refill()
+
+            self._tokens -= 1
+
+
+class Scheduler:
+    def __init__(self):
+        self._global_bucket = TokenBucket(rate=settings.MAX_REQUESTS_PER_SECOND)
+        self._host_buckets: dict[str, TokenBucket] = {}
+        self._proxy_buckets: dict[str, TokenBucket] = {}
+
+        self._queue: list[tuple[float, int, str, asyncio.Future | object]] = []
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._next_due: dict[str, float] = {}
+        self._counter = count()
+        self._wakeup = asyncio.Event()
+        self._dispatcher: asyncio.Task | None = None
+
+    def next_due(self, session_name: str) -> float | None:
+        return self._next_due.get(session_name)
+
+    async def wait(self, session_name: str, delay: float) -> None:
+        due = monotonic() + delay
+        future = asyncio.get_running_loop().create_future()
+
+        heapq.heappush(self._queue, (due, next(self._counter), session_name, future))
+        self._next_due[session_name] = due
+        self._wakeup.set()
+
+        try:
+            await future
+        finally:
+            if self._next_due.get(session_name) == due:
+                del self._next_due[session_name]
+
+    def schedule(self, session_name: str, item: object, delay: float) -> None:
+        due = monotonic() + delay
+
+        heapq.heappush(self._queue, (due, next(self._counter), session_name, item))
+        self._next_due[session_name] = due
+        self._wakeup.set()
+
+    async def ready(self) -> object:
+        return await self._ready.get()
+
+    async def throttle(self, url: str, proxy: str | None) -> None:
+        host = urlsplit(url).hostname
+
+        host_bucket = self._host_buckets.get(host)
+        if host_bucket is None:
+            host_bucket = self._host_buckets[host] = TokenBucket(rate=settings.MAX_REQUESTS_PER_SECOND_PER_HOST)
+
+        await self._global_bucket.acquire()
+        await host_bucket.acquire()
+
+        if proxy:
+            proxy_bucket = self._proxy_buckets.get(proxy)
+            if proxy_bucket is None:
+                proxy_bucket = self._proxy_buckets[proxy] = TokenBucket(
+                    rate=settings.MAX_REQUESTS_PER_SECOND_PER_PROXY)
+
+            await proxy_bucket.acquire()
+
+    async def _dispatch(self) -> None:
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            due, _, session_name, waiter = self._queue[0]
+            delay = due - monotonic()
+
+            if delay > 0:
+                self._wakeup.clear()
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                continue
+
+            heapq.heappop(self._queue)
+
+            if isinstance(waiter, asyncio.Future):
+                if not waiter.done():
+                    waiter.set_result(None)
+            else:
+                if self._next_due.get(session_name) == due:
+                    del self._next_due[session_name]
+
+                self._ready.put_nowait(waiter)
+
+    def start(self) -> None:
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def close(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._dispatcher
+            self._dispatcher = None
+
+        for *_, waiter in self._queue:
+            if isinstance(waiter, asyncio.Future):
+                waiter.cancel()
+
+        self._queue.clear()
+
+    async def __aenter__(self) -> 'Scheduler':
+        self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
@@ -0,0 +1,130 @@
+import os
+import json
+import shutil
+from time import time
+
+from bot.config import settings
+from bot.utils import logger
+
+
+def get_session_path(session_name: str) -> str:
+    return os.path.join('sessions', f'{session_name}.session')
+
+
+class SessionReport:
+    def __init__(self, path: str):
+        self.path = path
+        self.sessions: dict[str, dict] = self._load()
+
+    def _load(self) -> dict[str, dict]:
+        if not os.path.exists(self.path):
+            return {}
+
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                return json.load(file).get('sessions', {})
+        except (OSError, ValueError) as error:
+            logger.warning(f"Unable to read sessions report {self.path}: {error}")
+            return {}
+
+    def set(self, session_name: str, status: str, reason: str | None = None, user: str | None = None) -> None:
+        self.sessions[session_name] = {'status': status, 'reason': reason, 'user': user, 'checked_at': time()}
+
+    def is_invalid(self, session_name: str) -> bool:
+        entry = self.sessions.get(session_name)
+
+        if entry is None or entry['status'] != 'invalid':
+            return False
+
+        try:
+            return os.path.getmtime(get_session_path(session_name=session_name)) <= entry['checked_at']
+        except OSError:
+            return True
+
+    def needs_check(self, session_name: str, max_age: float) -> bool:
+        entry = self.sessions.get(session_name)
+
+        if entry is None:
+            return True
+
+        if entry['status'] == 'valid':
+            return time() - entry['checked_at'] > max_age
+
+        return not self.is_invalid(session_name=session_name)
+
+    def quarantine(self, session_name: str, path: str) -> None:
+        entry = self.sessions[session_name]
+
+        os.makedirs(path, exist_ok=True)
+        shutil.move(get_session_path(session_name=session_name), os.path.join(path, f'{session_name}.session'))
+
+        with open(os.path.join(path, f'{session_name}.reason'), 'w', encoding='utf-8') as file:
+            file.write(f"{entry['reason']}\n")
+
+        entry['status'] = 'quarantined'
+
+        logger.warning(f"{session_name} | Moved to {path}: {entry['reason']}")
+
+    def filter_valid(self, session_names: list[str]) -> list[str]:
+        invalid = {session_name for session_name in session_names if self.is_invalid(session_name=session_name)}
+
+        if invalid:
+            logger.warning(f"Skipped {len(invalid)} invalid sessions from {self.path}: {', '.join(sorted(invalid))}")
+
+        return [session_name for session_name in session_names if session_name not in invalid]
+
+    def save(self) -> None:
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        temp_path = f'{self.path}.tmp'
+
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'updated_at': time(), 'sessions': dict(sorted(self.sessions.items()))},
+                      file, indent=2, ensure_ascii=False)
+
+        os.replace(temp_path, self.path)
+
+    def summary(self, session_names: list[str]) -> None:
+        entries = {session_name: self.sessions[session_name]
+                   for session_name in session_names if session_name in self.sessions}
+        counts = {status: sum(entry['status'] == status for entry in entries.values())
+                  for status in ('valid', 'invalid', 'unknown')}
+
+        for session_name, entry in entries.items():
+            if entry['status'] != 'valid':
+                logger.warning(f"{session_name} | {entry['status'].capitalize()}: {entry['reason']}")
+
+        logger.info(f"Sessions checked: {len(entries)} | Valid: {counts['valid']} | Invalid: {counts['invalid']} "
+                    f"| Unknown: {counts['unknown']} | Report: {self.path}")
+
+
+async def preflight(session_names: list[str], proxies: list[str]) -> list[str]:
+    report = SessionReport(path=settings.SESSIONS_REPORT_PATH)
+    unchecked = [session_name for session_name in session_names
+                 if report.needs_check(session_name=session_name, max_age=settings.SESSION_CHECK_MAX_AGE)]
+
+    if unchecked:
+        from .registrator import BatchRegistrator
+
+        logger.info(f"Pre-flight: checking {len(unchecked)} sessions | "
+                    f"Cached: {len(session_names) - len(unchecked)}")
+
+        await BatchRegistrator(report=report, proxies=proxies).validate_all(session_names=unchecked)
+        report.summary(session_names=unchecked)
+
+    valid = []
+
+    for session_name in session_names:
+        if not report.is_invalid(session_name=session_name):
+            valid.append(session_name)
+            continue
+
+        try:
+            report.quarantine(session_name=session_name, path=settings.SESSIONS_QUARANTINE_DIR)
+        except OSError as error:
+            logger.error(f"{session_name} | Unable to quarantine session: {error}")
+
+    report.save()
+
+    return valid
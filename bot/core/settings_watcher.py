@@ -0,0 +1,59 @@
+import os
+import signal
+import asyncio
+from contextlib import suppress
+
+from bot.config import settings
+from bot.utils import logger
+
+
+class SettingsWatcher:
+    def __init__(self, interval: float):
+        self.interval = interval
+
+        self._mtimes = self._snapshot()
+        self._task: asyncio.Task | None = None
+
+    @staticmethod
+    def _snapshot() -> dict[str, float]:
+        mtimes = {}
+
+        for path in settings.watched_files():
+            with suppress(OSError):
+                mtimes[path] = os.path.getmtime(path)
+
+        return mtimes
+
+    def reload(self) -> None:
+        self._mtimes = self._snapshot()
+
+        try:
+            changed = settings.reload()
+        except Exception as error:
+            logger.error(f"Settings reload failed, keeping the current settings: {error}")
+            return
+
+        logger.info(f"Settings reloaded | Changed: {', '.join(changed) or 'nothing'} "
+                    f"| Account overrides: {len(settings.overrides)}")
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(delay=self.interval)
+
+            if self._snapshot() != self._mtimes:
+                self.reload()
+
+    def start(self) -> None:
+        with suppress(AttributeError, NotImplementedError, RuntimeError):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self.reload)
+
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._watch())
+
+    def close(self) -> None:
+        with suppress(AttributeError, NotImplementedError, RuntimeError):
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
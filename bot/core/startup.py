@@ -0,0 +1,58 @@
+import asyncio
+from time import time
+
+from bot.utils import logger
+from .scheduler import TokenBucket
+
+
+class StartupPipeline:
+    def __init__(self, total: int, concurrency: int, ramp_rate: float, timeout: float):
+        self.total = total
+        self.timeout = timeout
+
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._ramp = TokenBucket(rate=ramp_rate, capacity=1)
+        self._pending: dict[str, asyncio.TimerHandle] = {}
+
+        self.ready = 0
+        self.failed = 0
+        self.timed_out = 0
+        self._started_at = time()
+        self._last_report = 0.
+
+    async def acquire(self, session_name: str) -> None:
+        await self._ramp.acquire()
+        await self._semaphore.acquire()
+
+        self._pending[session_name] = asyncio.get_running_loop().call_later(
+            self.timeout, self.release, session_name, None)
+
+    def release(self, session_name: str, ready: bool | None) -> None:
+        timer = self._pending.pop(session_name, None)
+
+        if timer is None:
+            return
+
+        timer.cancel()
+        self._semaphore.release()
+
+        if ready is True:
+            self.ready += 1
+        elif ready is False:
+            self.failed += 1
+        else:
+            self.timed_out += 1
+
+        self.report()
+
+    def report(self) -> None:
+        finished = self.ready + self.failed + self.timed_out
+
+        if time() - self._last_report < 5 and finished < self.total:
+            return
+
+        self._last_report = time()
+
+        logger.info(f"Startup: <g>{self.ready}</g>/{self.total} ready | "
+                    f"Failed: <r>{self.failed}</r> | Timed out: <y>{self.timed_out}</y> | "
+                    f"In progress: <c>{len(self._pending)}</c> | {int(time() - self._started_at)}s elapsed")
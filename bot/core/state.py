@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+from enum import Enum
+
+from .profile import ProfileState
+
+
+class Stage(Enum):
+    AUTH = 'auth'
+    SYNC = 'sync'
+    TAP = 'tap'
+    BOOST = 'boost'
+    APPLY_BOOST = 'apply_boost'
+    UPGRADE = 'upgrade'
+    SLEEP = 'sleep'
+
+
+@dataclass(slots=True)
+class AccountState:
+    stage: Stage = Stage.AUTH
+    profile: ProfileState | None = None
+    access_token_created_time: float = 0
+    boost_last_check: float = 0
+    use_boost: bool = False
+    boost_applied: bool = False
+    check_upgrades: bool = True
+    errors_in_row: int = 0
+    next_step_at: float = 0
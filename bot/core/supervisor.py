@@ -0,0 +1,228 @@
+import os
+import asyncio
+from contextlib import suppress
+from time import monotonic
+from typing import Callable
+
+from bot.config import settings
+from bot.utils import logger
+from bot.utils.metrics import metrics
+from bot.exceptions import InvalidSession
+from .sessions import SessionReport, get_session_path
+from .startup import StartupPipeline
+from .proxy_pool import ProxyPool, format_proxy
+from .tapper import Tapper
+
+
+def get_mtime(session_name: str) -> float | None:
+    try:
+        return os.path.getmtime(get_session_path(session_name=session_name))
+    except OSError:
+        return None
+
+
+def clear_metrics(session_name: str) -> None:
+    for gauge in (metrics.balance, metrics.energy, metrics.passive_income):
+        gauge.remove(session_name)
+
+
+class Account:
+    __slots__ = ('tapper', 'task', 'status', 'resumed', 'draining', 'stepping', 'failed_mtime')
+
+    def __init__(self, tapper: Tapper):
+        self.tapper = tapper
+        self.task: asyncio.Task | None = None
+        self.status = 'starting'
+        self.resumed = asyncio.Event()
+        self.resumed.set()
+        self.draining = False
+        self.stepping = False
+        self.failed_mtime: float | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.task is None or self.task.done()
+
+    def describe(self) -> dict:
+        tapper = self.tapper
+        state = tapper.state
+        next_due = tapper.scheduler.next_due(session_name=tapper.session_name)
+
+        return {
+            'session': tapper.session_name,
+            'status': self.status,
+            'stage': state.stage.value,
+            'balance': state.profile.balance if state.profile is not None else None,
+            'passive_per_hour': state.profile.earn_passive_per_hour if state.profile is not None else None,
+            'errors_in_row': state.errors_in_row,
+            'proxy': format_proxy(tapper.proxy),
+            'next_step_in': round(max(next_due - monotonic(), 0), 1) if next_due is not None else None,
+        }
+
+
+class AccountSupervisor:
+    def __init__(self, create_tapper: Callable[[str], Tapper], list_sessions: Callable[[], list[str]],
+                 proxy_pool: ProxyPool, startup: StartupPipeline, interval: float,
+                 session_filter: Callable[[str], bool] | None = None):
+        self.create_tapper = create_tapper
+        self.list_sessions = list_sessions
+        self.proxy_pool = proxy_pool
+        self.startup = startup
+        self.interval = interval
+        self.session_filter = session_filter
+
+        self.accounts: dict[str, Account] = {}
+        self.tappers: dict[str, Tapper] = {}
+
+        self._changed = asyncio.Event()
+
+    async def _run_account(self, account: Account) -> None:
+        tapper = account.tapper
+        session_name = tapper.session_name
+
+        try:
+            await self.startup.acquire(session_name=session_name)
+            delay = tapper.prepare(proxy=self.proxy_pool.assign(session_name=session_name))
+
+            while not account.draining:
+                if delay > 0:
+                    await tapper.sleep(delay=delay)
+
+                if not account.resumed.is_set():
+                    await account.resumed.wait()
+
+                if account.draining:
+                    break
+
+                account.status = 'running'
+                account.stepping = True
+                try:
+                    delay = await tapper.step()
+                finally:
+                    account.stepping = False
+
+            account.status = 'drained'
+        except InvalidSession:
+            logger.error(f"{session_name} | Invalid Session")
+            account.status = 'invalid'
+            account.failed_mtime = get_mtime(session_name=session_name)
+        except asyncio.CancelledError:
+            account.status = 'drained' if account.draining else 'stopped'
+
+            if not account.draining:
+                raise
+        finally:
+            self.startup.release(session_name=session_name, ready=False)
+            clear_metrics(session_name=session_name)
+            self._changed.set()
+
+    def _start(self, account: Account) -> None:
+        if account.task is not None:
+            self.startup.total += 1
+
+        account.draining = False
+        account.status = 'starting'
+        account.resumed.set()
+        account.task = asyncio.create_task(self._run_account(account=account), name=account.tapper.session_name)
+
+    def add(self, session_name: str) -> None:
+        tapper = self.create_tapper(session_name)
+        account = Account(tapper=tapper)
+
+        self.accounts[session_name] = account
+        self.tappers[session_name] = tapper
+
+        self._start(account=account)
+
+    def remove(self, session_name: str) -> None:
+        self.drain(session_name=session_name)
+
+        self.accounts.pop(session_name, None)
+        self.tappers.pop(session_name, None)
+        self.proxy_pool.release(session_name=session_name)
+        clear_metrics(session_name=session_name)
+
+    def pause(self, session_name: str) -> None:
+        account = self.accounts[session_name]
+
+        if not account.finished:
+            account.resumed.clear()
+            account.status = 'paused'
+
+    def resume(self, session_name: str) -> None:
+        account = self.accounts[session_name]
+
+        if account.finished:
+            self._start(account=account)
+        elif not account.draining:
+            account.resumed.set()
+            account.status = 'running'
+
+    def drain(self, session_name: str) -> None:
+        account = self.accounts.get(session_name)
+
+        if account is None or account.finished:
+            return
+
+        account.draining = True
+        account.status = 'draining'
+        account.resumed.set()
+
+        if not account.stepping:
+            account.task.cancel()
+
+    def describe(self) -> list[dict]:
+        return [account.describe() for account in self.accounts.values()]
+
+    def sync_sessions(self) -> None:
+        report = SessionReport(path=settings.SESSIONS_REPORT_PATH)
+        session_names = {session_name for session_name in self.list_sessions()
+                         if (self.session_filter is None or self.session_filter(session_name))
+                         and not report.is_invalid(session_name=session_name)}
+
+        for session_name in sorted(session_names - self.accounts.keys()):
+            logger.info(f"{session_name} | Session file added, starting")
+            self.startup.total += 1
+            self.add(session_name=session_name)
+
+        for session_name in sorted(self.accounts.keys() - session_names):
+            logger.info(f"{session_name} | Session file removed, stopping")
+            self.remove(session_name=session_name)
+
+        for session_name in session_names:
+            account = self.accounts[session_name]
+
+            if account.status == 'invalid' and account.finished and get_mtime(session_name) != account.failed_mtime:
+                logger.info(f"{session_name} | Session file changed, restarting")
+                self._start(account=account)
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(delay=self.interval)
+
+            try:
+                self.sync_sessions()
+            except Exception as error:
+                logger.error(f"Unknown error while watching sessions: {error}")
+
+    async def run(self, session_names: list[str]) -> None:
+        for session_name in session_names:
+            self.add(session_name=session_name)
+
+        watcher = asyncio.create_task(self._watch()) if self.interval > 0 else None
+
+        try:
+            while watcher is not None or not all(account.finished for account in self.accounts.values()):
+                self._changed.clear()
+                await self._changed.wait()
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+            tasks = [account.task for account in self.accounts.values() if not account.finished]
+
+            for task in tasks:
+                task.cancel()
+
+            with suppress(asyncio.CancelledError):
+                await asyncio.gather(*tasks, return_exceptions=True)
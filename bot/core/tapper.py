@@ -1,501 +1,731 @@
 import asyncio
-from time import time
-from random import randint
-from urllib.parse import unquote
+from time import time, monotonic
+from typing import TYPE_CHECKING
+from dataclasses import asdict
+from random import randint, random
+from urllib.parse import unquote, urlsplit
 
 import datetime
 
 import aiohttp
-from aiohttp_proxy import ProxyConnector
-from better_proxy import Proxy
-from pyrogram import Client
-from pyrogram.errors import Unauthorized, UserDeactivated, AuthKeyUnregistered
-from pyrogram.raw.functions.messages import RequestWebView
-
-from bot.config import settings
-from bot.utils import logger
+
+from bot.config import settings, current_account
+from bot.utils import logger, serializer
+from bot.utils.metrics import metrics
 from bot.exceptions import InvalidSession
-from .headers import headers
+from bot.profiling import startup as startup_profile
+from bot.profiling.runtime import current_stage
+from .http_pool import HttpClientPool
+from .scheduler import Scheduler
+from .planner import TapPlanner, get_tap_count, get_energy_boost
+from .profile import ProfileState
+from .auth_cache import AuthCache
+from .startup import StartupPipeline
+from .upgrades import UpgradePlanner
+from .response_cache import ResponseCache
+from .state import AccountState, Stage
+from .retry import RetryPolicy, backoff_delay
+from .proxy_pool import ProxyPool, format_proxy
+from .tg_client import TgConnectionPool, get_proxy_dict
 #from .user_agents import user_agents #add separate user agents for each account
 
+if TYPE_CHECKING:
+    from pyrogram import Client
+
 
 class Tapper:
-    def __init__(self, tg_client: Client):
+    def __init__(self, tg_client: 'Client', tg_pool: TgConnectionPool, http_pool: HttpClientPool,
+                 scheduler: Scheduler, auth_cache: AuthCache, startup: StartupPipeline, retry_policy: RetryPolicy,
+                 proxy_pool: ProxyPool):
         self.session_name = tg_client.name
         self.tg_client = tg_client
+        self.tg_pool = tg_pool
+        self.http_pool = http_pool
+        self.scheduler = scheduler
+        self.auth_cache = auth_cache
+        self.startup = startup
+        self.retry_policy = retry_policy
+        self.proxy_pool = proxy_pool
+        self.headers = {}
+        self.proxy = None
+
+        self.state = AccountState()
+        self.refresh_spread = random()
+        self.tap_planner = TapPlanner()
+        self.upgrade_planner = UpgradePlanner()
+        self.settings_version = settings.version
+        self.response_cache = ResponseCache(ttls={'tasks': settings.TASKS_CACHE_TTL,
+                                                  'boosts': settings.BOOSTS_CACHE_TTL,
+                                                  'upgrades': settings.UPGRADES_CACHE_TTL})
+
+    async def sleep(self, delay: float) -> None:
+        stage_token = current_stage.set(self.state.stage.value)
 
-    async def get_tg_web_data(self, proxy: str | None) -> str:
-        if proxy:
-            proxy = Proxy.from_str(proxy)
-            proxy_dict = dict(
-                scheme=proxy.protocol,
-                hostname=proxy.host,
-                port=proxy.port,
-                username=proxy.login,
-                password=proxy.password
-            )
-        else:
-            proxy_dict = None
+        try:
+            await self.scheduler.wait(session_name=self.session_name, delay=delay)
+        finally:
+            current_stage.reset(stage_token)
+
+    async def api_post(self, http_client: aiohttp.ClientSession, url: str, json: dict,
+                       idempotent: bool = False) -> dict:
+        return await self.retry_policy.call(url=url, idempotent=idempotent,
+                                            request=lambda: self.send_request(http_client=http_client, url=url,
+                                                                              json=json))
+
+    async def send_request(self, http_client: aiohttp.ClientSession, url: str, json: dict) -> dict:
+        await self.scheduler.throttle(url=url, proxy=self.proxy)
+        startup_profile.finish(name='first request')
+
+        endpoint = urlsplit(url).path
+        started_at = monotonic()
+
+        try:
+            async with http_client.post(url=url, data=serializer.dumps(json), headers=self.headers) as response:
+                metrics.requests.inc(endpoint, str(response.status))
+
+                if response.status == 401:
+                    self.auth_cache.invalidate(session_name=self.session_name)
+                    self.headers.pop("Authorization", None)
 
-        self.tg_client.proxy = proxy_dict
+                response.raise_for_status()
+
+                body = await response.read()
+        except Exception as error:
+            metrics.request_errors.inc(endpoint, type(error).__name__)
+            self.proxy_pool.record(proxy=self.proxy, latency=monotonic() - started_at,
+                                   ok=not isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError)))
+            raise
+        finally:
+            metrics.request_latency.observe(endpoint, value=monotonic() - started_at)
+
+        self.proxy_pool.record(proxy=self.proxy, latency=monotonic() - started_at, ok=True)
+
+        return serializer.loads(body) if body.strip() else None
+
+    def update_profile(self, profile: ProfileState) -> None:
+        self.tap_planner.update(profile=profile)
+
+        metrics.balance.set(self.session_name, value=profile.balance)
+        metrics.energy.set(self.session_name, value=profile.available_taps)
+        metrics.passive_income.set(self.session_name, value=profile.earn_passive_per_hour)
+
+    async def get_tg_web_data(self, proxy: str | None, use_cache: bool = True) -> str:
+        auth_entry = self.auth_cache.get(session_name=self.session_name)
+
+        if use_cache and auth_entry.has_valid_tg_web_data:
+            return auth_entry.tg_web_data
+
+        from pyrogram.errors import Unauthorized, UserDeactivated, AuthKeyUnregistered
+        from pyrogram.raw.functions.messages import RequestWebView
+        from pyrogram.raw.types import InputPeerUser
+
+        proxy_dict = get_proxy_dict(proxy=proxy)
 
         try:
-            if not self.tg_client.is_connected:
-                try:
-                    await self.tg_client.connect()
-                except (Unauthorized, UserDeactivated, AuthKeyUnregistered):
+            async with self.tg_pool.connection(tg_client=self.tg_client, proxy=proxy_dict) as authorized:
+                if not authorized:
                     raise InvalidSession(self.session_name)
 
-            web_view = await self.tg_client.invoke(RequestWebView(
-                peer=await self.tg_client.resolve_peer('hamster_kombat_bot'),
-                bot=await self.tg_client.resolve_peer('hamster_kombat_bot'),
-                platform='android',
-                from_bot_menu=False,
-                url='https://hamsterkombat.io/'
-            ))
+                if auth_entry.peer_id:
+                    peer = InputPeerUser(user_id=auth_entry.peer_id, access_hash=auth_entry.peer_access_hash)
+                else:
+                    peer = await self.tg_client.resolve_peer('hamster_kombat_bot')
+                    self.auth_cache.set_peer(session_name=self.session_name,
+                                             peer_id=peer.user_id,
+                                             peer_access_hash=peer.access_hash)
+
+                web_view = await self.tg_client.invoke(RequestWebView(
+                    peer=peer,
+                    bot=peer,
+                    platform='android',
+                    from_bot_menu=False,
+                    url='https://hamsterkombat.io/'
+                ))
 
             auth_url = web_view.url
             tg_web_data = unquote(
                 string=unquote(
                     string=auth_url.split('tgWebAppData=', maxsplit=1)[1].split('&tgWebAppVersion', maxsplit=1)[0]))
 
-            if self.tg_client.is_connected:
-                await self.tg_client.disconnect()
+            self.auth_cache.set_tg_web_data(session_name=self.session_name,
+                                            tg_web_data=tg_web_data,
+                                            expires_at=time() + settings.TG_WEB_DATA_TTL)
 
             return tg_web_data
 
         except InvalidSession as error:
             raise error
 
+        except (Unauthorized, UserDeactivated, AuthKeyUnregistered):
+            raise InvalidSession(self.session_name)
+
         except Exception as error:
             logger.error(f"{self.session_name} | Unknown error during Authorization: {error}")
-            await asyncio.sleep(delay=3)
+            self.auth_cache.set_peer(session_name=self.session_name, peer_id=None, peer_access_hash=None)
+
+    async def refresh_tg_web_data(self) -> None:
+        auth_entry = self.auth_cache.get(session_name=self.session_name)
+        refresh_margin = settings.AUTH_REFRESH_MARGIN + self.refresh_spread * settings.AUTH_REFRESH_SPREAD
+
+        if (auth_entry.has_valid_access_token
+                and time() >= auth_entry.access_token_expires_at - refresh_margin
+                and auth_entry.tg_web_data_expires_at <= auth_entry.access_token_expires_at):
+            logger.info(f"{self.session_name} | Refreshing authorization data before sleep")
+
+            await self.get_tg_web_data(proxy=self.proxy, use_cache=False)
 
     async def login(self, http_client: aiohttp.ClientSession, tg_web_data: str) -> str:
         try:
-            response = await http_client.post(url='https://api.hamsterkombat.io/auth/auth-by-telegram-webapp',
-                                              json={"initDataRaw": tg_web_data, "fingerprint": {}})
-            response.raise_for_status()
-
-            response_json = await response.json()
+            response_json = await self.api_post(http_client=http_client,
+                                                url=f'{settings.API_URL}/auth/auth-by-telegram-webapp',
+                                                json={"initDataRaw": tg_web_data, "fingerprint": {}},
+                                                idempotent=True)
             access_token = response_json['authToken']
 
             return access_token
         except Exception as error:
             logger.error(f"{self.session_name} | Unknown error while getting Access Token: {error}")
-            await asyncio.sleep(delay=3)
 
-    async def get_profile_data(self, http_client: aiohttp.ClientSession) -> dict[str]:
+    async def get_profile_data(self, http_client: aiohttp.ClientSession) -> ProfileState:
         try:
-            response = await http_client.post(url='https://api.hamsterkombat.io/clicker/sync',
-                                              json={})
-            response.raise_for_status()
-
-            response_json = await response.json()
-            profile_data = response_json['clickerUser']
+            response_json = await self.api_post(http_client=http_client,
+                                                url=f'{settings.API_URL}/clicker/sync',
+                                                json={},
+                                                idempotent=True)
+            profile = ProfileState.from_dict(response_json['clickerUser'])
 
-            return profile_data
+            return profile
         except Exception as error:
             logger.error(f"{self.session_name} | Unknown error while getting Profile Data: {error}")
-            await asyncio.sleep(delay=3)
 
     async def get_tasks(self, http_client: aiohttp.ClientSession) -> dict[str]:
-        try:
-            response = await http_client.post(url='https://api.hamsterkombat.io/clicker/list-tasks',
-                                              json={})
-            response.raise_for_status()
+        cached = self.response_cache.get('tasks')
+
+        if cached is not None:
+            return cached
 
-            response_json = await response.json()
+        try:
+            response_json = await self.api_post(http_client=http_client,
+                                                url=f'{settings.API_URL}/clicker/list-tasks',
+                                                json={},
+                                                idempotent=True)
             tasks = response_json['tasks']
+            self.response_cache.set('tasks', tasks)
 
             return tasks
         except Exception as error:
             logger.error(f"{self.session_name} | Unknown error while getting Tasks: {error}")
-            await asyncio.sleep(delay=3)
 
     async def select_exchange(self, http_client: aiohttp.ClientSession, exchange_id: str) -> bool:
         try:
-            response = await http_client.post(url='https://api.hamsterkombat.io/clicker/select-exchange',
-                                              json={'exchangeId': exchange_id})
-            response.raise_for_status()
+            await self.api_post(http_client=http_client,
+                                url=f'{settings.API_URL}/clicker/select-exchange',
+                                json={'exchangeId': exchange_id})
 
             return True
         except Exception as error:
             logger.error(f"{self.session_name} | Unknown error while Select Exchange: {error}")
-            await asyncio.sleep(delay=3)
 
             return False
 
     async def get_daily(self, http_client: aiohttp.ClientSession):
         try:
-            response = await http_client.post(url='https://api.hamsterkombat.io/clicker/check-task',
-                                              json={'taskId': "streak_days"})
-            response.raise_for_status()
+            await self.api_post(http_client=http_client,
+                                url=f'{settings.API_URL}/clicker/check-task',
+                                json={'taskId': "streak_days"})
+            self.response_cache.invalidate('tasks')
 
             return True
         except Exception as error:
             logger.error(f"{self.session_name} | Unknown error while getting Daily: {error}")
-            await asyncio.sleep(delay=3)
 
             return False
 
     async def apply_boost(self, http_client: aiohttp.ClientSession, boost_id: str) -> bool:
         try:
-            response = await http_client.post(url='https://api.hamsterkombat.io/clicker/buy-boost',
-                                              json={'timestamp': time(), 'boostId': boost_id})
-            response.raise_for_status()
+            await self.api_post(http_client=http_client,
+                                url=f'{settings.API_URL}/clicker/buy-boost',
+                                json={'timestamp': time(), 'boostId': boost_id})
+            self.response_cache.invalidate('boosts')
 
             return True
         except Exception as error:
             logger.error(f"{self.session_name} | Unknown error while Apply {boost_id} Boost: {error}")
-            await asyncio.sleep(delay=3)
 
             return False
 
     async def get_upgrades(self, http_client: aiohttp.ClientSession) -> list[dict]:
-        try:
-            response = await http_client.post(url='https://api.hamsterkombat.io/clicker/upgrades-for-buy',
-                                              json={})
-            response.raise_for_status()
+        cached = self.response_cache.get('upgrades')
+
+        if cached is not None:
+            return cached
 
-            response_json = await response.json()
+        try:
+            response_json = await self.api_post(http_client=http_client,
+                                                url=f'{settings.API_URL}/clicker/upgrades-for-buy',
+                                                json={},
+                                                idempotent=True)
             upgrades = response_json['upgradesForBuy']
+            self.response_cache.set('upgrades', upgrades)
+            self.upgrade_planner.load(upgrades=upgrades)
 
             return upgrades
         except Exception as error:
             logger.error(f"{self.session_name} | Unknown error while getting Upgrades: {error}")
-            await asyncio.sleep(delay=3)
             
     async def get_boosts(self, http_client: aiohttp.ClientSession) -> list[dict]:
-        try:
-            response = await http_client.post(url='https://api.hamsterkombat.io/clicker/boosts-for-buy',
-                                              json={})
-            response.raise_for_status()
+        cached = self.response_cache.get('boosts')
 
-            response_json = await response.json()
-            upgrades = response_json['boostsForBuy']
+        if cached is not None:
+            return cached
 
-            return upgrades
+        try:
+            response_json = await self.api_post(http_client=http_client,
+                                                url=f'{settings.API_URL}/clicker/boosts-for-buy',
+                                                json={},
+                                                idempotent=True)
+            boosts = response_json['boostsForBuy']
+            self.response_cache.set('boosts', boosts)
+
+            return boosts
         except Exception as error:
             logger.error(f"{self.session_name} | Unknown error while getting Upgrades: {error}")
-            await asyncio.sleep(delay=3)
 
-    async def buy_upgrade(self, http_client: aiohttp.ClientSession, upgrade_id: str) -> bool:
+    async def buy_upgrade(self, http_client: aiohttp.ClientSession, upgrade_id: str) -> list[dict] | None:
         try:
-            response = await http_client.post(url='https://api.hamsterkombat.io/clicker/buy-upgrade',
-                                              json={'timestamp': time(), 'upgradeId': upgrade_id})
-            response.raise_for_status()
+            response_json = await self.api_post(http_client=http_client,
+                                                url=f'{settings.API_URL}/clicker/buy-upgrade',
+                                                json={'timestamp': time(), 'upgradeId': upgrade_id})
+            upgrades = response_json.get('upgradesForBuy', [])
 
-            return True
+            if upgrades:
+                self.response_cache.set('upgrades', upgrades)
+            else:
+                self.response_cache.invalidate('upgrades')
+
+            return upgrades
         except Exception as error:
             logger.error(f"{self.session_name} | Unknown error while buying Upgrade: {error}")
-            await asyncio.sleep(delay=3)
 
-            return False
-
-    async def send_taps(self, http_client: aiohttp.ClientSession, available_energy: int, taps: int, earn_per_tap: int) -> dict[str]:
+    async def send_taps(self, http_client: aiohttp.ClientSession, available_energy: int, taps: int, earn_per_tap: int) -> ProfileState:
         response_json = None
         request_json = None
         try:
-            if taps > available_energy:
-                taps = available_energy
-                
-            if available_energy - taps / earn_per_tap - 1 < settings.MIN_AVAILABLE_ENERGY:
-                taps = available_energy - settings.MIN_AVAILABLE_ENERGY
-                if taps < 1:
-                    taps = 1
-            
-            count = int(taps / earn_per_tap - 1)
-            
-            if count < 1:
-                count = 1
-            
-            request_json = {'availableTaps': available_energy, 'count': count, 'timestamp': int(time())}
-            response = await http_client.post(
-                url='https://api.hamsterkombat.io/clicker/tap',
-                json= request_json)
-            response.raise_for_status()
+            count = get_tap_count(available_energy=available_energy, taps=taps, earn_per_tap=earn_per_tap)
 
-            response_json = await response.json()
-            profile_data = response_json['clickerUser']
+            request_json = {'availableTaps': available_energy, 'count': count, 'timestamp': int(time())}
+            response_json = await self.api_post(http_client=http_client,
+                                                url=f'{settings.API_URL}/clicker/tap',
+                                                json=request_json)
+            profile = ProfileState.from_dict(response_json['clickerUser'])
 
-            return profile_data
+            return profile
         except Exception as error:
             logger.error(f"{self.session_name} | Unknown error while Tapping: {error} | response_json: {response_json} | request_json: {request_json}")
-            await asyncio.sleep(delay=3)
 
-    async def check_proxy(self, http_client: aiohttp.ClientSession, proxy: Proxy) -> None:
+    def log_tap(self, balance: int) -> None:
+        profile = self.state.profile
+
+        logger.success(f"{self.session_name} | Successful tapped! | "
+                       f"Balance: <c>{profile.balance}</c> (<g>+{profile.balance - balance}</g>) | "
+                       f"Total: <e>{profile.total}</e> | "
+                       f"Farm: <g>{profile.hourly_earnings}</g><c>[{profile.earn_passive_per_hour}]</c>")
+
+    def backoff(self) -> float:
+        delay = backoff_delay(attempt=self.state.errors_in_row)
+        self.state.errors_in_row += 1
+        self.state.stage = Stage.AUTH
+        self.update_proxy()
+
+        return delay
+
+    def update_proxy(self) -> None:
+        self.proxy = self.proxy_pool.reassign(session_name=self.session_name, proxy=self.proxy)
+
+    def apply_settings(self) -> None:
+        self.settings_version = settings.version
+        self.state.check_upgrades = True
+        self.upgrade_planner.rebuild()
+
+    def checkpoint(self) -> dict:
+        state = self.state
+        next_due = self.scheduler.next_due(session_name=self.session_name)
+
+        return {
+            'profile': asdict(state.profile) if state.profile is not None else None,
+            'profile_updated_at': self.tap_planner.updated_at,
+            'access_token_created_time': state.access_token_created_time,
+            'boost_last_check': state.boost_last_check,
+            'use_boost': state.use_boost,
+            'boost_applied': state.boost_applied,
+            'next_step_at': time() + next_due - monotonic() if next_due is not None else time(),
+            'response_cache': self.response_cache.snapshot(),
+        }
+
+    def restore(self, checkpoint: dict) -> None:
+        state = self.state
+
+        state.access_token_created_time = checkpoint['access_token_created_time']
+        state.boost_last_check = checkpoint['boost_last_check']
+        state.use_boost = checkpoint['use_boost']
+        state.boost_applied = checkpoint['boost_applied']
+        state.next_step_at = checkpoint['next_step_at']
+
+        if checkpoint['profile'] is not None:
+            state.profile = ProfileState(**checkpoint['profile'])
+            self.tap_planner.update(profile=state.profile)
+            self.tap_planner.updated_at = checkpoint['profile_updated_at']
+
+        self.response_cache.restore(entries=checkpoint['response_cache'])
+
+        upgrades = self.response_cache.get('upgrades')
+        if upgrades:
+            self.upgrade_planner.load(upgrades=upgrades)
+
+    def prepare(self, proxy: str | None) -> float:
+        self.proxy = proxy
+
+        if proxy:
+            logger.info(f"{self.session_name} | Proxy: {format_proxy(proxy)}")
+
+        auth_entry = self.auth_cache.get(session_name=self.session_name)
+
+        if auth_entry.has_valid_access_token:
+            self.headers["Authorization"] = f"Bearer {auth_entry.access_token}"
+            self.state.access_token_created_time = auth_entry.access_token_expires_at - settings.ACCESS_TOKEN_TTL
+
+            logger.info(f"{self.session_name} | Authorization restored from cache")
+
+            if self.state.profile is not None:
+                logger.info(f"{self.session_name} | Resumed from checkpoint")
+                self.startup.release(session_name=self.session_name, ready=True)
+
+                return max(self.state.next_step_at - time(), 0)
+
+        return 0
+
+    async def step(self) -> float:
+        http_client = self.http_pool.get(proxy=self.proxy)
+        stage = self.state.stage
+        stage_handler = getattr(self, f'{stage.value}_stage')
+        account_token = current_account.set(self.session_name)
+        stage_token = current_stage.set(stage.value)
+        started_at = monotonic()
+
+        if self.settings_version != settings.version:
+            self.apply_settings()
+
         try:
-            response = await http_client.get(url='https://httpbin.org/ip', timeout=aiohttp.ClientTimeout(5))
-            ip = (await response.json()).get('origin')
-            logger.info(f"{self.session_name} | Proxy IP: {ip}")
+            return await stage_handler(http_client=http_client)
+        except InvalidSession as error:
+            raise error
         except Exception as error:
-            logger.error(f"{self.session_name} | Proxy: {proxy} | Error: {error}")
+            delay = self.backoff()
 
-    async def run(self, proxy: str | None) -> None:
-        access_token_created_time = 0
-        turbo_time = 0
-        active_turbo = False
-        check_upgrades = True
-
-        proxy_conn = ProxyConnector().from_url(proxy) if proxy else None
-
-        async with (aiohttp.ClientSession(headers=headers, connector=proxy_conn) as http_client):
-            if proxy:
-                await self.check_proxy(http_client=http_client, proxy=proxy)
-
-            boost_last_check = time() - 3800
-            use_boost = False
-
-            while True:
-                try:
-                    while True:
-                        if time() - access_token_created_time >= 3600:
-                            logger.warning(f"{self.session_name} | Authorization started")
-                            tg_web_data = await self.get_tg_web_data(proxy=proxy)
-                            access_token = await self.login(http_client=http_client, tg_web_data=tg_web_data)
-
-                            http_client.headers["Authorization"] = f"Bearer {access_token}"
-                            headers["Authorization"] = f"Bearer {access_token}"
-
-                            access_token_created_time = time()
-                            profile_data = None
-                            
-                        if not profile_data:
-                            profile_data = await self.get_profile_data(http_client=http_client)
-                            
-                            if not profile_data:
-                                logger.warning(f"{self.session_name} | Profile data broken, trying to fetch from tap request...")
-                                
-                                profile_data = await self.send_taps(http_client=http_client,
-                                                           available_energy=1000,
-                                                           taps=1,
-                                                           earn_per_tap = 1)
-                                                           
-                                if not profile_data:
-                                    logger.warning(f"{self.session_name} | Server is down, trying in 1 minute...")                      
-                                    await asyncio.sleep(delay=60)
-                                continue
-                                
-                            logger.success(f"{self.session_name} | Profile data loaded!")    
-                                
-                            exchange_id = profile_data.get('exchangeId')
-                        
-                            if not exchange_id:
-                                status = await self.select_exchange(http_client=http_client, exchange_id="bybit")
-                                if status is True:
-                                    logger.success(f"{self.session_name} | Successfully selected exchange <y>Bybit</y>")
-
-                            last_passive_earn = int(profile_data['lastPassiveEarn'])
-                            earn_on_hour = profile_data['earnPassivePerHour']
-                            earn_per_tap = profile_data['earnPerTap']
-
-                            logger.info(f"{self.session_name} | Last passive earn: <g>+{last_passive_earn}</g> | "
-                                        f"Earn every hour: <y>{earn_on_hour}</y>")
-
-                            available_energy = profile_data['availableTaps']
-                            balance = int(profile_data['balanceCoins'])
-
-                            tasks = await self.get_tasks(http_client=http_client)
-
-                            daily_task = tasks[-1]
-                            rewards = daily_task['rewardsByDays']
-                            is_completed = daily_task['isCompleted']
-                            days = daily_task['days']
-                            
-                            if is_completed is False:
-                                status = await self.get_daily(http_client=http_client)
-                                if status is True:
-                                    logger.success(f"{self.session_name} | Successfully get daily reward | "
-                                                   f"Days: <m>{days}</m> | Reward coins: {rewards[days-1]['rewardCoins']}")
-                            
-                            break
-                        break
-                    
-                    #if available_energy > settings.MIN_AVAILABLE_ENERGY:
-                    taps = randint(a=settings.RANDOM_TAPS_COUNT[0], b=settings.RANDOM_TAPS_COUNT[1])
-                    
-                    if active_turbo:
-                        taps += settings.ADD_TAPS_ON_TURBO
-                        if time() - turbo_time > 20:
-                            active_turbo = False
-                            turbo_time = 0
-
-                    profile_data = await self.send_taps(http_client=http_client,
-                                                       available_energy=available_energy,
-                                                       taps=taps,
-                                                       earn_per_tap = earn_per_tap)
-
-                    if not profile_data:
-                        logger.info(f"{self.session_name} | <y>Sleeping 1 min...</y>")
-                        await asyncio.sleep(delay=60)
-                        continue
-
-                    # REQUEST BASED CONSTANTS
-                    available_energy = profile_data['availableTaps']
-                    new_balance = int(profile_data['balanceCoins'])
-                    calc_taps = new_balance - balance
-                    balance = new_balance
-                    total = int(profile_data['totalCoins'])
-                    earn_on_hour = profile_data['earnPassivePerHour']
-                    PLAYER_DATA_MAX_TAPS = profile_data['maxTaps']
-                    PLAYER_DATA_TAPS_RECOVER_PER_SEC = profile_data['tapsRecoverPerSec']
-                    PLAYER_DATA_EARN_PASSIVE_PER_HOUR = profile_data['earnPassivePerHour']
-                    PLAYER_DATA_HOURLY_EARNINGS = 3600 * PLAYER_DATA_TAPS_RECOVER_PER_SEC + PLAYER_DATA_EARN_PASSIVE_PER_HOUR
-
-                    #boosts = profile_data['boosts']
-                    energy_boost_time = profile_data['boosts'].get('BoostFullAvailableTaps', {}).get('lastUpgradeAt', 0)
-                    energy_boost_level = profile_data['boosts'].get('BoostFullAvailableTaps', {}).get('level', 0)
-
-                    logger.success(f"{self.session_name} | Successful tapped! | "
-                                   f"Balance: <c>{balance}</c> (<g>+{calc_taps}</g>) | Total: <e>{total}</e> | Farm: <g>{PLAYER_DATA_HOURLY_EARNINGS}</g><c>[{PLAYER_DATA_EARN_PASSIVE_PER_HOUR}]</c>")
-
-                    if active_turbo is False:
-                        
-                        maxLevelEnergyBoost = 6
-                        
-                        if settings.APPLY_DAILY_ENERGY is True:
-                            if time() - boost_last_check > 3650:
-                                boosts = await self.get_boosts(http_client=http_client)
-                                if boosts:
-                                    boost_last_check = time()
-                                    for item in boosts:
-                                        if item.get("id") == "BoostFullAvailableTaps":
-                                            fullTapsBoost = item
-                                            maxLevelEnergyBoost = fullTapsBoost["maxLevel"]
-                                            if fullTapsBoost["level"] < maxLevelEnergyBoost:    
-                                                logger.info(f"{self.session_name} | <y>Boosts info: <b>{fullTapsBoost['level']}/{fullTapsBoost['maxLevel']}</b> | Next check: {datetime.datetime.fromtimestamp(boost_last_check + 3650).strftime('%H:%M:%S')}</y>")
-                                                use_boost = True
-                                            else:
-                                                use_boost = False
-                                                logger.info(f"{self.session_name} | <y>All boosts already used for today. Lets try after 6h</y>")
-                                                boost_last_check = time() + 3600 * 5
-                                            break    
-                                else:
-                                    logger.warning(f"{self.session_name} | <y>Boosts fetch is broken. Skipping...</y>")
-                    
-                        if (use_boost is True
-                                and time() - energy_boost_time > 3600):
-                                
-                            logger.info(f"{self.session_name} | <y>Using full energy before boost apply...</y>")
-                            await asyncio.sleep(delay=1)
-                            profile_data = await self.send_taps(http_client=http_client,
-                                                       available_energy=available_energy,
-                                                       taps=available_energy,
-                                                       earn_per_tap = earn_per_tap)
-                            logger.info(f"{self.session_name} | <y>Applying boost...</y>")
-                            await asyncio.sleep(delay=1)
-                            status = await self.apply_boost(http_client=http_client, boost_id="BoostFullAvailableTaps")
-                            if status is True:
-                                logger.success(f"{self.session_name} | <g>Successfully applied energy boost</g>")
-                                await asyncio.sleep(delay=3)
-                                
-                                profile_data = await self.send_taps(http_client=http_client,
-                                                       available_energy=PLAYER_DATA_MAX_TAPS,
-                                                       taps=PLAYER_DATA_MAX_TAPS,
-                                                       earn_per_tap = earn_per_tap)
-                                                       
-                                if not profile_data:
-                                    logger.warning(f"{self.session_name} | Something went wrong! Skipping...")
-                                    continue
-                                else:
-                                    available_energy = profile_data['availableTaps']
-                                    new_balance = int(profile_data['balanceCoins'])
-                                    calc_taps = new_balance - balance
-                                    balance = new_balance
-                                    total = int(profile_data['totalCoins'])
-                                    earn_on_hour = profile_data['earnPassivePerHour']
-                                    PLAYER_DATA_MAX_TAPS = profile_data['maxTaps']
-                                    PLAYER_DATA_TAPS_RECOVER_PER_SEC = profile_data['tapsRecoverPerSec']
-                                    PLAYER_DATA_EARN_PASSIVE_PER_HOUR = profile_data['earnPassivePerHour']
-                                    PLAYER_DATA_HOURLY_EARNINGS = 3600 * PLAYER_DATA_TAPS_RECOVER_PER_SEC + PLAYER_DATA_EARN_PASSIVE_PER_HOUR
-                                    logger.success(f"{self.session_name} | Successful tapped! | "
-                                                    f"Balance: <c>{balance}</c> (<g>+{calc_taps}</g>) | Total: <e>{total}</e> | Farm: <g>{PLAYER_DATA_HOURLY_EARNINGS}</g><c>[{PLAYER_DATA_EARN_PASSIVE_PER_HOUR}]</c>")
-                            else:
-                                logger.warnign(f"{self.session_name} | <y>Boost broken, skipping...</y>")
-
-                            continue
-
-                        if settings.AUTO_UPGRADE is True and check_upgrades is True:
-                            upgrades = await self.get_upgrades(http_client=http_client)
-                            available_upgrades = [upgrade for upgrade in upgrades if upgrade["isAvailable"] and not upgrade["isExpired"] and upgrade["level"] <= settings.MAX_LEVEL]
-                            
-                            while True:
-                                best_upgrade = max(available_upgrades, key=lambda x: (x["profitPerHourDelta"] / x["price"]) if x["price"] != 0 else float('-inf'))
-                                cooldown = best_upgrade.get('cooldownSeconds', 0) / 3600
-                                time_to_earn = (best_upgrade["price"] - balance) / PLAYER_DATA_HOURLY_EARNINGS
-                                
-                                if time_to_earn < cooldown:
-                                    time_to_earn = cooldown
-                                                                
-                                time_to_return = int(best_upgrade["price"]/best_upgrade["profitPerHourDelta"])
-                                logger.info(f"{self.session_name} | Best upgrade for now: <e>{best_upgrade['id']}</e> | <g>+{best_upgrade['profitPerHourDelta']}</g> | price:<b>{best_upgrade['price']}</b> | TTR: <b>{time_to_return}</b>")
-                                await asyncio.sleep(delay=1)
-                                
-                                if best_upgrade['price'] / best_upgrade['profitPerHourDelta'] > settings.UPGRADE_MAX_RETURN_PERIOD_HOURS:
-                                    logger.warning(f"{self.session_name} | <y>Upgrade return time [{int(best_upgrade['price'] / best_upgrade['profitPerHourDelta'])}] > [{settings.UPGRADE_MAX_RETURN_PERIOD_HOURS}] than maximum allowed. Cancelling checking upgrades...</y>")
-                                    check_upgrades = False
-                                    break
-                                
-                                
-                                if balance > best_upgrade['price'] and time_to_earn <= 0:
-                                    status = await self.buy_upgrade(http_client=http_client, upgrade_id=best_upgrade['id'])
-                                    if status is True:
-                                        earn_on_hour += best_upgrade['profitPerHourDelta']
-                                        logger.success(
-                                            f"{self.session_name} | "
-                                            f"Successfully upgraded <e>{best_upgrade['id']}</e> to <m>{best_upgrade['level']}</m> lvl | "
-                                            f"Earn every hour: <y>{earn_on_hour}</y> (<g>+{best_upgrade['profitPerHourDelta']}</g>)")
-
-                                        await asyncio.sleep(delay=1)
-                                        break
-                                    else:
-                                        logger.warning(f"{self.session_name} | Upgrade declined by server. Skipping...")
-                                        break
-                                else:
-                                    if time_to_earn > settings.MAX_EARNING_TIME_HOURS:
-                                        logger.info(f"{self.session_name} | Time to earn greater than max allowed - continue looking for the best upgrade...")
-                                        await asyncio.sleep(delay=1)
-                                        available_upgrades = [upgrade for upgrade in available_upgrades if upgrade["price"] < best_upgrade['price']]
-                                        
-                                        if not available_upgrades:
-                                            logger.info(f"{self.session_name} | No suitable upgrade found within the earning time limit. Try to increase limit or just wait for <g>$$$</g>.")
-                                            break
-                                    else:
-                                        if time_to_earn >= 1:
-                                            logger.info(f"{self.session_name} | Approximately time to earn: <e>{'{:.2f}'.format(time_to_earn)}</e> hour(s)")
-                                        else:
-                                            logger.info(f"{self.session_name} | Approximately time to earn: <e>{'{:.2f}'.format(time_to_earn*60)}</e> minute(s)")
-                                        break
-
-                        #if available_energy < settings.MIN_AVAILABLE_ENERGY:
-                         #   logger.info(f"{self.session_name} | Minimum energy reached: {available_energy}")
-                          #  logger.info(f"{self.session_name} | Sleep {settings.SLEEP_BY_MIN_ENERGY}s")
-#
- #                           await asyncio.sleep(delay=settings.SLEEP_BY_MIN_ENERGY)
-  #                          profile_data = None
-#
- #                           continue
-
-                except InvalidSession as error:
-                    raise error
-
-                except Exception as error:
-                    logger.error(f"{self.session_name} | Unknown error: {error}")
-                    await asyncio.sleep(delay=60)
+            logger.error(f"{self.session_name} | Unknown error: {error} | Retry in {int(delay)}s")
 
-                else:
-                    sleep_between_clicks = randint(a=settings.SLEEP_BETWEEN_TAP[0], b=settings.SLEEP_BETWEEN_TAP[1])
+            return delay
+        finally:
+            metrics.stage_latency.observe(stage.value, value=monotonic() - started_at)
+            current_stage.reset(stage_token)
+            current_account.reset(account_token)
+
+    async def auth_stage(self, http_client: aiohttp.ClientSession) -> float:
+        state = self.state
+
+        if (time() - state.access_token_created_time >= settings.ACCESS_TOKEN_TTL
+                or "Authorization" not in self.headers):
+            logger.warning(f"{self.session_name} | Authorization started")
+            tg_web_data = await self.get_tg_web_data(proxy=self.proxy)
+
+            if not tg_web_data:
+                delay = self.backoff()
+
+                logger.warning(f"{self.session_name} | Telegram authorization failed, trying in {int(delay)}s...")
+
+                return delay
+
+            access_token = await self.login(http_client=http_client, tg_web_data=tg_web_data)
+
+            if not access_token:
+                self.auth_cache.invalidate(session_name=self.session_name)
+                delay = self.backoff()
+
+                logger.warning(f"{self.session_name} | Login failed, trying in {int(delay)}s...")
+
+                return delay
+
+            self.auth_cache.set_access_token(session_name=self.session_name,
+                                             access_token=access_token,
+                                             expires_at=time() + settings.ACCESS_TOKEN_TTL)
+            self.headers["Authorization"] = f"Bearer {access_token}"
+
+            state.access_token_created_time = time()
+            state.profile = None
+
+        state.stage = Stage.SYNC if state.profile is None else Stage.TAP
+
+        return 0
+
+    async def sync_stage(self, http_client: aiohttp.ClientSession) -> float:
+        state = self.state
+        started_at = monotonic()
+
+        reads = [self.get_profile_data(http_client=http_client), self.get_tasks(http_client=http_client)]
+
+        if (settings.APPLY_DAILY_ENERGY is True and settings.BOOSTS_CACHE_TTL > 0
+                and time() - state.boost_last_check > 3650):
+            reads.append(self.get_boosts(http_client=http_client))
+
+        if settings.AUTO_UPGRADE is True and settings.UPGRADES_CACHE_TTL > 0 and state.check_upgrades is True:
+            reads.append(self.get_upgrades(http_client=http_client))
+
+        profile, tasks, *_ = await asyncio.gather(*reads)
+        reads_time = monotonic() - started_at
+
+        if not profile:
+            logger.warning(f"{self.session_name} | Profile data broken, trying to fetch from tap request...")
+
+            state.profile = await self.send_taps(http_client=http_client, available_energy=1000, taps=1, earn_per_tap=1)
+
+            if not state.profile:
+                delay = self.backoff()
+
+                logger.warning(f"{self.session_name} | Server is down, trying in {int(delay)}s...")
+
+                return delay
+
+            state.stage = Stage.AUTH
+
+            return 0
+
+        state.profile = profile
+
+        logger.success(f"{self.session_name} | Profile data loaded!")
+
+        self.startup.release(session_name=self.session_name, ready=True)
+
+        self.update_profile(profile=profile)
+
+        logger.info(f"{self.session_name} | Last passive earn: <g>+{profile.last_passive_earn}</g> | "
+                    f"Earn every hour: <y>{profile.earn_passive_per_hour}</y>")
+
+        writes = {}
+
+        if not profile.exchange_id:
+            writes['exchange'] = self.select_exchange(http_client=http_client, exchange_id="bybit")
+
+        daily_task = tasks[-1] if tasks else None
+
+        if daily_task is not None and daily_task['isCompleted'] is False:
+            writes['daily'] = self.get_daily(http_client=http_client)
+
+        results = dict(zip(writes, await asyncio.gather(*writes.values())))
+
+        if results.get('exchange') is True:
+            logger.success(f"{self.session_name} | Successfully selected exchange <y>Bybit</y>")
+
+        if results.get('daily') is True:
+            days = daily_task['days']
+            logger.success(f"{self.session_name} | Successfully get daily reward | "
+                           f"Days: <m>{days}</m> | Reward coins: {daily_task['rewardsByDays'][days-1]['rewardCoins']}")
+
+        logger.debug(f"{self.session_name} | Sync took {(monotonic() - started_at) * 1000:.0f} ms "
+                     f"(reads: {reads_time * 1000:.0f} ms, {len(reads)} requests | writes: {len(writes)} requests)")
+
+        state.stage = Stage.TAP
+
+        return 0
+
+    async def tap_stage(self, http_client: aiohttp.ClientSession) -> float:
+        state = self.state
+        balance = state.profile.balance
+
+        if state.boost_applied:
+            available_energy = taps = state.profile.max_taps
+            state.boost_applied = False
+        elif settings.TAP_MODE == 'planned':
+            available_energy = taps = self.tap_planner.energy()
+        else:
+            available_energy = state.profile.available_taps
+            taps = randint(a=settings.RANDOM_TAPS_COUNT[0], b=settings.RANDOM_TAPS_COUNT[1])
+
+        profile = await self.send_taps(http_client=http_client,
+                                       available_energy=available_energy,
+                                       taps=taps,
+                                       earn_per_tap=state.profile.earn_per_tap)
+
+        if not profile:
+            delay = self.backoff()
+
+            logger.info(f"{self.session_name} | <y>Sleeping {int(delay)}s...</y>")
+
+            return delay
+
+        state.errors_in_row = 0
+        state.profile = profile
+        self.update_profile(profile=profile)
+        self.log_tap(balance=balance)
+
+        state.stage = Stage.BOOST
+
+        return 0
+
+    async def boost_stage(self, http_client: aiohttp.ClientSession) -> float:
+        state = self.state
+
+        if settings.APPLY_DAILY_ENERGY is True and time() - state.boost_last_check > 3650:
+            boosts = await self.get_boosts(http_client=http_client)
+
+            if boosts:
+                state.boost_last_check = time()
+                energy_boost = get_energy_boost(boosts=boosts)
+
+                if energy_boost is not None and energy_boost["level"] < energy_boost["maxLevel"]:
+                    logger.info(f"{self.session_name} | <y>Boosts info: <b>{energy_boost['level']}/{energy_boost['maxLevel']}</b> | Next check: {datetime.datetime.fromtimestamp(state.boost_last_check + 3650).strftime('%H:%M:%S')}</y>")
+                    state.use_boost = True
+                elif energy_boost is not None:
+                    state.use_boost = False
+                    logger.info(f"{self.session_name} | <y>All boosts already used for today. Lets try after 6h</y>")
+                    state.boost_last_check = time() + 3600 * 5
+            else:
+                logger.warning(f"{self.session_name} | <y>Boosts fetch is broken. Skipping...</y>")
+
+        if state.use_boost is True and time() - state.profile.energy_boost_time > 3600:
+            logger.info(f"{self.session_name} | <y>Using full energy before boost apply...</y>")
+
+            state.stage = Stage.APPLY_BOOST
+
+            return 1
+
+        state.stage = Stage.UPGRADE
+
+        return 0
+
+    async def apply_boost_stage(self, http_client: aiohttp.ClientSession) -> float:
+        state = self.state
+
+        profile = await self.send_taps(http_client=http_client,
+                                       available_energy=state.profile.available_taps,
+                                       taps=state.profile.available_taps,
+                                       earn_per_tap=state.profile.earn_per_tap)
+        if profile:
+            state.profile = profile
+            self.update_profile(profile=profile)
+
+        logger.info(f"{self.session_name} | <y>Applying boost...</y>")
+
+        status = await self.apply_boost(http_client=http_client, boost_id="BoostFullAvailableTaps")
+
+        if status is True:
+            logger.success(f"{self.session_name} | <g>Successfully applied energy boost</g>")
+
+            state.boost_applied = True
+            state.stage = Stage.AUTH
+
+            return 3
+
+        delay = backoff_delay(attempt=state.errors_in_row)
+        state.errors_in_row += 1
+        state.use_boost = False
+        state.stage = Stage.UPGRADE
+
+        logger.warning(f"{self.session_name} | <y>Boost broken, skipping until the next boosts check | "
+                       f"Continue in {int(delay)}s...</y>")
+
+        return delay
+
+    async def upgrade_stage(self, http_client: aiohttp.ClientSession) -> float:
+        state = self.state
+        profile = state.profile
+
+        state.stage = Stage.SLEEP
+
+        if settings.AUTO_UPGRADE is not True or state.check_upgrades is not True:
+            return 0
+
+        if not self.response_cache.is_fresh('upgrades'):
+            await self.get_upgrades(http_client=http_client)
+
+        best_upgrade = self.upgrade_planner.best()
+
+        if best_upgrade is None:
+            logger.info(f"{self.session_name} | No available upgrades for now")
+
+            return 0
+
+        return_period = self.upgrade_planner.return_period(best_upgrade)
+        time_to_return = int(return_period)
+
+        if return_period > settings.UPGRADE_MAX_RETURN_PERIOD_HOURS:
+            logger.warning(f"{self.session_name} | <y>Upgrade return time [{time_to_return}] > [{settings.UPGRADE_MAX_RETURN_PERIOD_HOURS}] than maximum allowed. Cancelling checking upgrades...</y>")
+            state.check_upgrades = False
+
+            return 0
+
+        logger.info(f"{self.session_name} | Best upgrade for now: <e>{best_upgrade['id']}</e> | <g>+{best_upgrade['profitPerHourDelta']}</g> | price:<b>{best_upgrade['price']}</b> | TTR: <b>{time_to_return}</b>")
+
+        upgrade_plan = self.upgrade_planner.plan(balance=profile.balance, hourly_earnings=profile.hourly_earnings)
+
+        for upgrade in upgrade_plan.purchases:
+            upgrades = await self.buy_upgrade(http_client=http_client, upgrade_id=upgrade['id'])
+
+            if upgrades is None:
+                logger.warning(f"{self.session_name} | Upgrade declined by server. Skipping...")
+                self.response_cache.invalidate('upgrades')
+                break
+
+            profile.balance -= upgrade['price']
+            profile.earn_passive_per_hour += upgrade['profitPerHourDelta']
+            logger.success(
+                f"{self.session_name} | "
+                f"Successfully upgraded <e>{upgrade['id']}</e> to <m>{upgrade['level']}</m> lvl | "
+                f"Earn every hour: <y>{profile.earn_passive_per_hour}</y> (<g>+{upgrade['profitPerHourDelta']}</g>)")
+
+            if upgrades:
+                self.upgrade_planner.update(upgrades=upgrades)
+
+        if upgrade_plan.target is not None:
+            time_to_earn = upgrade_plan.time_to_earn
+
+            if time_to_earn >= 1:
+                logger.info(f"{self.session_name} | Approximately time to earn <e>{upgrade_plan.target['id']}</e>: <e>{'{:.2f}'.format(time_to_earn)}</e> hour(s)")
+            else:
+                logger.info(f"{self.session_name} | Approximately time to earn <e>{upgrade_plan.target['id']}</e>: <e>{'{:.2f}'.format(time_to_earn*60)}</e> minute(s)")
+        elif not upgrade_plan.purchases:
+            logger.info(f"{self.session_name} | No suitable upgrade found within the earning time limit. Try to increase limit or just wait for <g>$$$</g>.")
+
+        return 0
+
+    async def sleep_stage(self, http_client: aiohttp.ClientSession) -> float:
+        await self.refresh_tg_web_data()
+        self.update_proxy()
+
+        if settings.TAP_MODE == 'planned':
+            sleep_between_clicks = int(self.tap_planner.delay())
+        else:
+            sleep_between_clicks = randint(a=settings.SLEEP_BETWEEN_TAP[0], b=settings.SLEEP_BETWEEN_TAP[1])
+
+        logger.info(f"{self.session_name} | Sleep {sleep_between_clicks}s")
+
+        self.state.stage = Stage.AUTH
+
+        return sleep_between_clicks
+
+    async def run(self, proxy: str | None) -> None:
+        delay = self.prepare(proxy=proxy)
 
-                    if active_turbo is True:
-                        sleep_between_clicks = 4
+        while True:
+            if delay > 0:
+                await self.sleep(delay=delay)
 
-                    logger.info(f"{self.session_name} | Sleep {sleep_between_clicks}s")
-                    await asyncio.sleep(delay=sleep_between_clicks)
+            delay = await self.step()
 
 
-async def run_tapper(tg_client: Client, proxy: str | None):
+async def run_tapper(tapper: Tapper, proxy: str | None):
     try:
-        await Tapper(tg_client=tg_client).run(proxy=proxy)
+        await tapper.run(proxy=proxy)
     except InvalidSession:
-        logger.error(f"{tg_client.name} | Invalid Session")
+        logger.error(f"{tapper.session_name} | Invalid Session")
+    finally:
+        tapper.startup.release(session_name=tapper.session_name, ready=False)
@@ -0,0 +1,187 @@
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager, suppress
+from time import monotonic
+from typing import TYPE_CHECKING, AsyncIterator, Callable
+
+from better_proxy import Proxy
+
+from bot.utils import logger
+from bot.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from pyrogram import Client
+
+
+def get_proxy_dict(proxy: str | None) -> dict | None:
+    if not proxy:
+        return None
+
+    proxy = Proxy.from_str(proxy)
+
+    return dict(
+        scheme=proxy.protocol,
+        hostname=proxy.host,
+        port=proxy.port,
+        username=proxy.login,
+        password=proxy.password
+    )
+
+
+class LazyTgClient:
+    def __init__(self, name: str, factory: Callable[[str], 'Client']):
+        self.name = name
+        self.proxy = None
+
+        self._factory = factory
+        self._client: 'Client | None' = None
+
+    @property
+    def client(self) -> 'Client':
+        if self._client is None:
+            self._client = self._factory(self.name)
+
+        self._client.proxy = self.proxy
+
+        return self._client
+
+    @property
+    def is_connected(self) -> bool:
+        return self._client is not None and self._client.is_connected
+
+    async def connect(self) -> bool:
+        return await self.client.connect()
+
+    async def disconnect(self) -> None:
+        if self._client is not None and self._client.is_connected:
+            await self._client.disconnect()
+
+        self._client = None
+
+    async def resolve_peer(self, peer_id: str):
+        return await self.client.resolve_peer(peer_id)
+
+    async def invoke(self, query):
+        return await self.client.invoke(query)
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        return getattr(self.client, name)
+
+
+class TgConnectionPool:
+    def __init__(self, max_connections: int, idle_connections: int, idle_timeout: float):
+        self.max_connections = max_connections
+        self.idle_connections = idle_connections
+        self.idle_timeout = idle_timeout
+
+        self.open = 0
+
+        self._semaphore = asyncio.Semaphore(max_connections)
+        self._idle: OrderedDict[str, tuple[LazyTgClient, float]] = OrderedDict()
+        self._waiting = 0
+        self._reaper: asyncio.Task | None = None
+
+    def _update_metrics(self) -> None:
+        metrics.tg_connections.set('active', value=self.open - len(self._idle))
+        metrics.tg_connections.set('idle', value=len(self._idle))
+
+    async def _acquire(self) -> None:
+        if self._semaphore.locked() and self._idle:
+            await self._evict(session_name=next(iter(self._idle)))
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self.open += 1
+        self._update_metrics()
+
+    async def _close(self, tg_client: LazyTgClient) -> None:
+        try:
+            await tg_client.disconnect()
+        except Exception as error:
+            logger.debug(f"{tg_client.name} | Error while disconnecting from Telegram: {error}")
+        finally:
+            self.open -= 1
+            self._semaphore.release()
+            self._update_metrics()
+
+    async def _evict(self, session_name: str) -> None:
+        tg_client, _ = self._idle.pop(session_name)
+
+        await self._close(tg_client=tg_client)
+
+    @asynccontextmanager
+    async def connection(self, tg_client: LazyTgClient, proxy: dict | None) -> AsyncIterator[bool]:
+        idle = self._idle.pop(tg_client.name, None)
+
+        if idle is not None and tg_client.proxy != proxy:
+            await self._close(tg_client=tg_client)
+            idle = None
+
+        if idle is None:
+            await self._acquire()
+
+            try:
+                tg_client.proxy = proxy
+                authorized = await tg_client.connect()
+            except BaseException:
+                await self._close(tg_client=tg_client)
+                raise
+        else:
+            authorized = True
+
+        try:
+            yield authorized
+        except BaseException:
+            await self._close(tg_client=tg_client)
+            raise
+
+        if not authorized:
+            await self._close(tg_client=tg_client)
+            return
+
+        self._idle[tg_client.name] = (tg_client, monotonic())
+
+        while self._idle and (len(self._idle) > self.idle_connections or self._waiting):
+            await self._evict(session_name=next(iter(self._idle)))
+
+        self._update_metrics()
+
+    async def _reap_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(delay=max(self.idle_timeout / 2, 1))
+
+            expired_at = monotonic() - self.idle_timeout
+            expired = [session_name for session_name, (_, released_at) in self._idle.items()
+                       if released_at <= expired_at]
+
+            for session_name in expired:
+                if session_name in self._idle:
+                    await self._evict(session_name=session_name)
+
+    def start(self) -> None:
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_periodically())
+
+    async def close(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._reaper
+            self._reaper = None
+
+        while self._idle:
+            await self._evict(session_name=next(iter(self._idle)))
+
+    async def __aenter__(self) -> 'TgConnectionPool':
+        self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
@@ -0,0 +1,112 @@
+import heapq
+from time import time
+from typing import NamedTuple
+
+from bot.config import settings
+
+
+class UpgradePlan(NamedTuple):
+    purchases: list[dict]
+    target: dict | None
+    time_to_earn: float
+
+
+class UpgradePlanner:
+    def __init__(self):
+        self._upgrades: dict[str, dict] = {}
+        self._versions: dict[str, int] = {}
+        self._cooldown_until: dict[str, float] = {}
+        self._heap: list[tuple[float, str, int]] = []
+
+    @staticmethod
+    def is_suitable(upgrade: dict) -> bool:
+        return (upgrade['isAvailable']
+                and not upgrade['isExpired']
+                and upgrade['level'] <= settings.MAX_LEVEL
+                and upgrade['price'] > 0
+                and upgrade['profitPerHourDelta'] > 0)
+
+    @staticmethod
+    def return_period(upgrade: dict) -> float:
+        return upgrade['price'] / upgrade['profitPerHourDelta']
+
+    def _set(self, upgrade: dict) -> None:
+        upgrade_id = upgrade['id']
+        version = self._versions.get(upgrade_id, 0) + 1
+
+        self._upgrades[upgrade_id] = upgrade
+        self._versions[upgrade_id] = version
+        self._cooldown_until[upgrade_id] = time() + upgrade.get('cooldownSeconds', 0)
+
+        if self.is_suitable(upgrade):
+            heapq.heappush(self._heap, (self.return_period(upgrade), upgrade_id, version))
+
+    def _is_current(self, entry: tuple[float, str, int]) -> bool:
+        return self._versions.get(entry[1]) == entry[2]
+
+    def load(self, upgrades: list[dict]) -> None:
+        self._upgrades.clear()
+        self._versions.clear()
+        self._cooldown_until.clear()
+        self._heap.clear()
+
+        for upgrade in upgrades:
+            self._set(upgrade)
+
+    def update(self, upgrades: list[dict]) -> None:
+        for upgrade in upgrades:
+            if self._upgrades.get(upgrade['id']) != upgrade:
+                self._set(upgrade)
+
+        if len(self._heap) > 2 * len(self._upgrades):
+            self._heap = [entry for entry in self._heap if self._is_current(entry)]
+            heapq.heapify(self._heap)
+
+    def rebuild(self) -> None:
+        self._heap = [(self.return_period(upgrade), upgrade_id, self._versions[upgrade_id])
+                      for upgrade_id, upgrade in self._upgrades.items() if self.is_suitable(upgrade)]
+        heapq.heapify(self._heap)
+
+    def best(self) -> dict | None:
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+
+        return self._upgrades[self._heap[0][1]] if self._heap else None
+
+    def plan(self, balance: float, hourly_earnings: float) -> UpgradePlan:
+        purchases = []
+        target = None
+        time_to_earn = 0.
+
+        popped = []
+        now = time()
+
+        try:
+            while self._heap:
+                entry = heapq.heappop(self._heap)
+
+                if not self._is_current(entry):
+                    continue
+
+                popped.append(entry)
+                return_period, upgrade_id, _ = entry
+
+                if return_period > settings.UPGRADE_MAX_RETURN_PERIOD_HOURS:
+                    break
+
+                upgrade = self._upgrades[upgrade_id]
+                cooldown = max(self._cooldown_until[upgrade_id] - now, 0) / 3600
+                upgrade_time_to_earn = max((upgrade['price'] - balance) / max(hourly_earnings, 1), cooldown)
+
+                if balance > upgrade['price'] and upgrade_time_to_earn <= 0:
+                    purchases.append(upgrade)
+                    balance -= upgrade['price']
+                elif upgrade_time_to_earn <= settings.MAX_EARNING_TIME_HOURS:
+                    target = upgrade
+                    time_to_earn = upgrade_time_to_earn
+                    break
+        finally:
+            for entry in popped:
+                heapq.heappush(self._heap, entry)
+
+        return UpgradePlan(purchases=purchases, target=target, time_to_earn=time_to_earn)
@@ -0,0 +1,231 @@
+import os
+import sys
+import json
+import asyncio
+import argparse
+from random import Random
+from statistics import median
+from time import perf_counter
+from typing import Callable
+
+from bot.config import settings
+from bot.utils import logger, serializer
+from bot.core.tapper import Tapper
+from bot.core.profile import ProfileState
+from bot.core.planner import get_tap_count, get_energy_boost
+from bot.core.upgrades import UpgradePlanner
+from bot.core.scheduler import Scheduler
+from bot.core.retry import RetryPolicy
+from bot.core.proxy_pool import ProxyPool
+from bot.core.auth_cache import AuthCache
+from bot.core.tg_client import TgConnectionPool
+from bot.core.startup import StartupPipeline
+from bot.core.state import Stage
+from .server import Account, MockHamsterServer
+from .http_client import FakeHttpPool
+from .tg_client import FakeTgClient
+
+MAX_STEPS_PER_CYCLE = 20
+
+
+def create_upgrades(count: int, seed: int = 0) -> list[dict]:
+    rnd = Random(seed)
+    upgrades = []
+
+    for index in range(count):
+        price = rnd.randint(100, 10_000_000)
+        upgrades.append({
+            'id': f'upgrade_{index}',
+            'level': rnd.randint(1, 20),
+            'price': price,
+            'profitPerHourDelta': max(int(price / rnd.uniform(5, 500)), 1),
+            'isAvailable': rnd.random() > 0.1,
+            'isExpired': rnd.random() < 0.05,
+            'cooldownSeconds': 0 if rnd.random() > 0.2 else rnd.randint(1, 3600),
+            'maxLevel': 25,
+        })
+
+    return upgrades
+
+
+def create_boosts(count: int) -> list[dict]:
+    boosts = [{'id': f'Boost{index}', 'level': 1, 'maxLevel': 10} for index in range(count - 1)]
+    boosts.append({'id': 'BoostFullAvailableTaps', 'level': 3, 'maxLevel': 6})
+
+    return boosts
+
+
+def measure(func: Callable[[], object], number: int, repeat: int) -> dict:
+    timings = []
+
+    for _ in range(repeat):
+        started_at = perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((perf_counter() - started_at) / number)
+
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min_us': round(min(timings) * 1e6, 3),
+        'median_us': round(median(timings) * 1e6, 3),
+    }
+
+
+def bench_tap_count(repeat: int) -> dict:
+    rnd = Random(0)
+    inputs = [(rnd.randint(0, 10_000), rnd.randint(1, 500), rnd.randint(1, 20)) for _ in range(1000)]
+
+    def run() -> None:
+        for available_energy, taps, earn_per_tap in inputs:
+            get_tap_count(available_energy=available_energy, taps=taps, earn_per_tap=earn_per_tap)
+
+    result = measure(run, number=100, repeat=repeat)
+    result['batch'] = len(inputs)
+
+    return result
+
+
+def bench_profile_parse(repeat: int) -> dict:
+    body = serializer.dumps({'clickerUser': Account(user_id=1).to_json()})
+
+    return measure(lambda: ProfileState.from_dict(serializer.loads(body)['clickerUser']), number=5000, repeat=repeat)
+
+
+def bench_upgrade_selection(upgrades_count: int, repeat: int) -> dict:
+    upgrades = create_upgrades(count=upgrades_count)
+    planner = UpgradePlanner()
+
+    def run() -> None:
+        planner.load(upgrades=upgrades)
+        planner.plan(balance=5_000_000, hourly_earnings=250_000)
+
+    return measure(run, number=max(10_000 // upgrades_count, 5), repeat=repeat)
+
+
+def bench_boost_decision(boosts_count: int, repeat: int) -> dict:
+    boosts = create_boosts(count=boosts_count)
+
+    def run() -> bool:
+        energy_boost = get_energy_boost(boosts=boosts)
+
+        return energy_boost is not None and energy_boost['level'] < energy_boost['maxLevel']
+
+    return measure(run, number=10_000, repeat=repeat)
+
+
+async def run_cycles(accounts: int, cycles: int) -> dict:
+    server = MockHamsterServer()
+    http_pool = FakeHttpPool(server=server)
+    auth_cache = AuthCache(path=':memory:')
+    startup = StartupPipeline(total=accounts, concurrency=accounts, ramp_rate=0, timeout=3600)
+    retry_policy = RetryPolicy()
+
+    try:
+        async with (Scheduler() as scheduler,
+                    TgConnectionPool(max_connections=accounts, idle_connections=0, idle_timeout=60) as tg_pool):
+            proxy_pool = ProxyPool(proxies=[], http_pool=http_pool)
+            tappers = [Tapper(tg_client=FakeTgClient(name=f'bench_{index}', user_id=index), tg_pool=tg_pool,
+                              http_pool=http_pool, scheduler=scheduler, auth_cache=auth_cache, startup=startup,
+                              retry_policy=retry_policy, proxy_pool=proxy_pool)
+                       for index in range(1, accounts + 1)]
+
+            for tapper in tappers:
+                tapper.prepare(proxy=None)
+
+            steps = 0
+            started_at = perf_counter()
+
+            for tapper in tappers:
+                for _ in range(cycles):
+                    for _ in range(MAX_STEPS_PER_CYCLE):
+                        stage = tapper.state.stage
+                        await tapper.step()
+                        steps += 1
+
+                        if stage is Stage.SLEEP:
+                            break
+                    else:
+                        raise RuntimeError(f"{tapper.session_name} did not finish a cycle "
+                                           f"in {MAX_STEPS_PER_CYCLE} steps")
+
+            elapsed = perf_counter() - started_at
+    finally:
+        auth_cache.close()
+
+    return {
+        'accounts': accounts,
+        'cycles': cycles,
+        'steps': steps,
+        'requests': http_pool.client.requests_count,
+        'total_s': round(elapsed, 4),
+        'per_cycle_us': round(elapsed / (accounts * cycles) * 1e6, 3),
+        'per_request_us': round(elapsed / max(http_pool.client.requests_count, 1) * 1e6, 3),
+    }
+
+
+def compare(report: dict, baseline: dict) -> None:
+    for name, result in report['results'].items():
+        base = baseline.get('results', {}).get(name)
+        key = 'per_cycle_us' if 'per_cycle_us' in result else 'min_us'
+
+        if not base or not base.get(key):
+            continue
+
+        change = (result[key] / base[key] - 1) * 100
+        print(f"    {name:<32} {base[key]:>12.3f} -> {result[key]:>12.3f} us  ({change:+.1f}%)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the Tapper decision logic and full cycles')
+    parser.add_argument('-a', '--accounts', type=int, nargs='+', default=[10, 100, 1000],
+                        help='Account counts for the end-to-end cycle benchmark')
+    parser.add_argument('-c', '--cycles', type=int, default=5, help='Tap cycles per account')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Repeats of every micro benchmark')
+    parser.add_argument('--json', dest='json_path', help='Write the report to this JSON file')
+    parser.add_argument('--compare', dest='compare_path', help='Compare with a previous JSON report')
+    args = parser.parse_args()
+
+    logger.remove()
+
+    settings.MAX_REQUESTS_PER_SECOND = 0
+    settings.MAX_REQUESTS_PER_SECOND_PER_HOST = 0
+    settings.API_URL = 'http://mock'
+
+    results = {
+        'tap_count': bench_tap_count(repeat=args.repeat),
+        'profile_parse': bench_profile_parse(repeat=args.repeat),
+        'boost_decision': bench_boost_decision(boosts_count=10, repeat=args.repeat),
+    }
+
+    for upgrades_count in (50, 500, 5000):
+        results[f'upgrade_selection_{upgrades_count}'] = bench_upgrade_selection(upgrades_count=upgrades_count,
+                                                                                 repeat=args.repeat)
+
+    for accounts in args.accounts:
+        results[f'cycle_{accounts}_accounts'] = asyncio.run(run_cycles(accounts=accounts, cycles=args.cycles))
+
+    report = {
+        'python': sys.version.split()[0],
+        'serializer': serializer.name,
+        'results': results,
+    }
+
+    for name, result in results.items():
+        print(f"    {name:<32} {json.dumps(result)}")
+
+    if args.compare_path:
+        with open(args.compare_path, encoding='utf-8') as file:
+            print('\nCompared with', args.compare_path)
+            compare(report=report, baseline=json.load(file))
+
+    if args.json_path:
+        if os.path.dirname(args.json_path):
+            os.makedirs(os.path.dirname(args.json_path), exist_ok=True)
+
+        with open(args.json_path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
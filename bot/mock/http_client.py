@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp import web
+
+from bot.utils import serializer
+from .server import MockHamsterServer
+
+
+class FakeResponse:
+    def __init__(self, status: int, body: bytes, headers: dict):
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(request_info=None, history=(), status=self.status,
+                                              message=self._body.decode(), headers=self.headers)
+
+    async def __aenter__(self) -> 'FakeResponse':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+
+class FakeRequestContext:
+    def __init__(self, client: 'FakeHttpClient', url: str, data: bytes, headers: dict):
+        self._client = client
+        self._url = url
+        self._data = data
+        self._headers = headers
+
+    async def __aenter__(self) -> FakeResponse:
+        return await self._client.handle(url=self._url, data=self._data, headers=self._headers)
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+
+class FakeHttpClient:
+    def __init__(self, server: MockHamsterServer):
+        self.server = server
+        self.closed = False
+        self.requests_count = 0
+
+        self._routes = {route.resource.canonical: route.handler for route in server.create_app().router.routes()}
+
+    async def handle(self, url: str, data: bytes, headers: dict) -> FakeResponse:
+        self.requests_count += 1
+
+        async def read_json() -> dict:
+            return serializer.loads(data) if data else {}
+
+        handler = self._routes.get(urlsplit(url).path)
+        if handler is None:
+            return FakeResponse(status=404, body=b'', headers={})
+
+        request = SimpleNamespace(headers=headers or {}, json=read_json)
+
+        try:
+            response = await handler(request)
+        except web.HTTPException as error:
+            response = error
+
+        return FakeResponse(status=response.status, body=response.body or b'', headers=dict(response.headers))
+
+    def post(self, url: str, data: bytes = b'', headers: dict | None = None, **kwargs) -> FakeRequestContext:
+        return FakeRequestContext(client=self, url=url, data=data, headers=headers)
+
+
+class FakeHttpPool:
+    def __init__(self, server: MockHamsterServer):
+        self.client = FakeHttpClient(server=server)
+
+    def get(self, proxy: str | None) -> FakeHttpClient:
+        return self.client
+
+    async def close(self) -> None:
+        self.client.closed = True
@@ -0,0 +1,218 @@
+import os
+import json
+import logging
+import asyncio
+import argparse
+from collections import Counter
+from time import monotonic, process_time
+
+import aiohttp
+
+from bot.config import settings
+from bot.utils import logger
+from bot.utils.logger import setup_logger
+from bot.utils.metrics import metrics
+from bot.core.tapper import Tapper, run_tapper
+from bot.core.runner import AccountRunner
+from bot.core.http_pool import HttpClientPool
+from bot.core.scheduler import Scheduler
+from bot.core.retry import RetryPolicy
+from bot.core.proxy_pool import ProxyPool
+from bot.core.auth_cache import AuthCache
+from bot.core.tg_client import TgConnectionPool
+from bot.core.startup import StartupPipeline
+from bot.profiling.runtime import RuntimeProfiler
+from .server import MockHamsterServer
+from .tg_client import FakeTgClient
+
+
+def get_peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values: list[float], percent: float) -> float:
+    if not values:
+        return 0.
+
+    values = sorted(values)
+    index = min(len(values) - 1, int(len(values) * percent / 100))
+
+    return values[index]
+
+
+class RequestStats:
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.endpoints = Counter()
+        self.statuses = Counter()
+        self.exceptions = Counter()
+
+    def create_trace_config(self) -> aiohttp.TraceConfig:
+        async def on_request_start(session, context, params):
+            context.started_at = monotonic()
+
+        async def on_request_end(session, context, params):
+            self.latencies.append(monotonic() - context.started_at)
+            self.endpoints[params.url.path] += 1
+            self.statuses[params.response.status] += 1
+
+        async def on_request_exception(session, context, params):
+            self.endpoints[params.url.path] += 1
+            self.exceptions[type(params.exception).__name__] += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+
+        return trace_config
+
+
+async def run_load_test(sessions: int, duration: float, latency: tuple[float, float], error_rate: float,
+                        rate_limit_rate: float, profile: float = 0) -> dict:
+    server = MockHamsterServer(latency=latency, error_rate=error_rate, rate_limit_rate=rate_limit_rate)
+    settings.API_URL = await server.start()
+
+    stats = RequestStats()
+    auth_cache = AuthCache(path=':memory:')
+    startup = StartupPipeline(total=sessions, concurrency=settings.STARTUP_CONCURRENCY,
+                              ramp_rate=settings.STARTUP_RAMP_RATE, timeout=settings.STARTUP_TIMEOUT)
+    retry_policy = RetryPolicy()
+
+    profile_report = None
+    started_at = monotonic()
+    cpu_started_at = process_time()
+
+    try:
+        async with (HttpClientPool(trace_configs=[stats.create_trace_config()]) as http_pool,
+                    Scheduler() as scheduler,
+                    TgConnectionPool(max_connections=settings.TG_MAX_CONNECTIONS,
+                                     idle_connections=settings.TG_IDLE_CONNECTIONS,
+                                     idle_timeout=settings.TG_IDLE_TIMEOUT) as tg_pool):
+            proxy_pool = ProxyPool(proxies=[], http_pool=http_pool)
+
+            tappers = [Tapper(tg_client=FakeTgClient(name=f'loadtest_{index}', user_id=index), tg_pool=tg_pool,
+                              http_pool=http_pool, scheduler=scheduler, auth_cache=auth_cache, startup=startup,
+                              retry_policy=retry_policy, proxy_pool=proxy_pool)
+                       for index in range(1, sessions + 1)]
+
+            if settings.ACCOUNT_WORKERS > 0:
+                runner = AccountRunner(scheduler=scheduler, startup=startup, workers=settings.ACCOUNT_WORKERS)
+                tasks = [asyncio.create_task(runner.run(accounts=[(tapper, None) for tapper in tappers]))]
+            else:
+                tasks = [asyncio.create_task(run_tapper(tapper=tapper, proxy=None)) for tapper in tappers]
+
+            if profile > 0:
+                profile_report = await RuntimeProfiler().run(duration=min(profile, duration))
+
+            await asyncio.sleep(delay=duration - (monotonic() - started_at))
+
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        auth_cache.close()
+        await server.stop()
+
+    elapsed = monotonic() - started_at
+    cpu_time = process_time() - cpu_started_at
+    requests_count = sum(stats.endpoints.values())
+
+    return {
+        'sessions': sessions,
+        'duration': round(elapsed, 2),
+        'requests': requests_count,
+        'requests_per_sec': round(requests_count / elapsed, 2),
+        'latency_p50_ms': round(percentile(stats.latencies, 50) * 1000, 2),
+        'latency_p99_ms': round(percentile(stats.latencies, 99) * 1000, 2),
+        'cpu_percent': round(cpu_time / elapsed * 100, 1),
+        'peak_rss_mb': get_peak_rss_mb(),
+        'statuses': {str(status): count for status, count in sorted(stats.statuses.items())},
+        'exceptions': dict(stats.exceptions),
+        'endpoints': dict(stats.endpoints.most_common()),
+        'stages': {labels[0]: {'count': count, 'mean_ms': round(total / count * 1000, 2)}
+                   for labels, (count, total) in metrics.stage_latency.totals().items() if count},
+        'server_requests': server.requests_count,
+        'server_injected_errors': server.injected_errors,
+        'profile': profile_report,
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"\nSessions: {report['sessions']} | Duration: {report['duration']}s")
+    print(f"Requests: {report['requests']} | {report['requests_per_sec']} req/s")
+    print(f"Latency: p50 {report['latency_p50_ms']} ms | p99 {report['latency_p99_ms']} ms")
+    print(f"CPU: {report['cpu_percent']}% | Peak RSS: {report['peak_rss_mb']} MB")
+    print(f"Statuses: {report['statuses']} | Exceptions: {report['exceptions']}")
+    print(f"Injected errors: {report['server_injected_errors']}\n")
+
+    for endpoint, count in report['endpoints'].items():
+        print(f"    {endpoint:<40} {count}")
+
+    print()
+
+    for stage, timings in report['stages'].items():
+        print(f"    {stage + ' stage':<40} {timings['count']:<8} {timings['mean_ms']} ms")
+
+    if report['profile'] is not None:
+        print(f"\nProfile: {report['profile']['path']}")
+
+        for stage, timings in report['profile']['stages'].items():
+            print(f"    {stage + ' stage':<40} {timings['callbacks']:<8} {timings['busy_ms']} ms busy")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Run simulated Tapper sessions against the mock Hamster API')
+    parser.add_argument('-s', '--sessions', type=int, default=1000)
+    parser.add_argument('-d', '--duration', type=float, default=60, help='Test duration in seconds')
+    parser.add_argument('--latency', type=float, nargs=2, default=[0.01, 0.05], metavar=('MIN', 'MAX'),
+                        help='Random mock server response delay in seconds')
+    parser.add_argument('--error-rate', type=float, default=0, help='Share of requests answered with 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0, help='Share of requests answered with 429')
+    parser.add_argument('--sleep', type=int, nargs=2, default=[1, 3], metavar=('MIN', 'MAX'),
+                        help='Overrides SLEEP_BETWEEN_TAP for the simulated sessions')
+    parser.add_argument('--rps', type=float, default=0,
+                        help='Overrides MAX_REQUESTS_PER_SECOND and MAX_REQUESTS_PER_SECOND_PER_HOST, 0 - unlimited')
+    parser.add_argument('--account-workers', type=int, default=0,
+                        help='Overrides ACCOUNT_WORKERS, 0 - one coroutine per session')
+    parser.add_argument('--profile', type=float, default=0,
+                        help='Profile the first N seconds and write the report to PROFILE_DIR')
+    parser.add_argument('--json', dest='json_path', help='Write the report to this JSON file')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Keep the bot log output')
+    args = parser.parse_args()
+
+    settings.SLEEP_BETWEEN_TAP = args.sleep
+    settings.STARTUP_CONCURRENCY = args.sessions
+    settings.STARTUP_RAMP_RATE = 0
+    settings.MAX_REQUESTS_PER_SECOND = args.rps
+    settings.MAX_REQUESTS_PER_SECOND_PER_HOST = args.rps
+    settings.ACCOUNT_WORKERS = args.account_workers
+
+    setup_logger()
+
+    if not args.verbose:
+        logger.remove()
+        logging.getLogger('aiohttp.server').setLevel(logging.CRITICAL)
+
+    report = asyncio.run(run_load_test(sessions=args.sessions, duration=args.duration, latency=tuple(args.latency),
+                                       error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                                       profile=args.profile))
+
+    print_report(report=report)
+
+    if args.json_path:
+        if os.path.dirname(args.json_path):
+            os.makedirs(os.path.dirname(args.json_path), exist_ok=True)
+
+        with open(args.json_path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,331 @@
+import json
+import asyncio
+import argparse
+from random import random, uniform
+from secrets import token_hex
+from time import time
+from urllib.parse import parse_qsl
+
+from aiohttp import web
+
+
+UPGRADES = [
+    ('hamster_youtube_channel', 1000, 120),
+    ('hamster_tiktok', 2500, 250),
+    ('marketing', 5000, 380),
+    ('legal_opinion', 7500, 520),
+    ('kyc', 10000, 700),
+    ('licence_europe', 25000, 1200),
+    ('staking', 50000, 2000),
+    ('web3_integration', 100000, 3500),
+]
+
+DAILY_REWARDS = [500, 1000, 2500, 5000, 15000, 25000, 100000, 500000, 1000000, 5000000]
+
+
+class Account:
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+
+        self.balance_coins = 0.
+        self.total_coins = 0.
+        self.available_taps = 1000.
+        self.max_taps = 1000
+        self.taps_recover_per_sec = 3
+        self.earn_per_tap = 1
+        self.earn_passive_per_hour = 0
+        self.last_passive_earn = 0.
+        self.exchange_id = None
+        self.updated_at = time()
+
+        self.daily_days = 1
+        self.daily_completed = False
+
+        self.boost_level = 0
+        self.boost_max_level = 6
+        self.boost_last_upgrade_at = 0
+
+        self.upgrades = {upgrade_id: dict(id=upgrade_id, level=1, price=price, profitPerHourDelta=profit,
+                                          isAvailable=True, isExpired=False, cooldownSeconds=0)
+                         for upgrade_id, price, profit in UPGRADES}
+
+    def sync(self) -> None:
+        now = time()
+        elapsed = now - self.updated_at
+
+        self.available_taps = min(self.max_taps, self.available_taps + elapsed * self.taps_recover_per_sec)
+        self.last_passive_earn = elapsed * self.earn_passive_per_hour / 3600
+        self.balance_coins += self.last_passive_earn
+        self.total_coins += self.last_passive_earn
+        self.updated_at = now
+
+    def add_coins(self, coins: float) -> None:
+        self.balance_coins += coins
+        self.total_coins += coins
+
+    def tap(self, count: int) -> None:
+        taps = min(count, int(self.available_taps // self.earn_per_tap))
+
+        self.available_taps -= taps * self.earn_per_tap
+        self.add_coins(coins=taps * self.earn_per_tap)
+
+    def to_json(self) -> dict:
+        return {
+            'id': str(self.user_id),
+            'totalCoins': self.total_coins,
+            'balanceCoins': self.balance_coins,
+            'level': 1,
+            'availableTaps': int(self.available_taps),
+            'lastSyncUpdate': int(self.updated_at),
+            'exchangeId': self.exchange_id,
+            'boosts': {
+                'BoostFullAvailableTaps': {
+                    'id': 'BoostFullAvailableTaps',
+                    'level': self.boost_level,
+                    'lastUpgradeAt': self.boost_last_upgrade_at
+                }
+            },
+            'upgrades': {upgrade_id: {'id': upgrade_id, 'level': upgrade['level'] - 1}
+                         for upgrade_id, upgrade in self.upgrades.items() if upgrade['level'] > 1},
+            'tasks': {},
+            'referralsCount': 0,
+            'maxTaps': self.max_taps,
+            'earnPerTap': self.earn_per_tap,
+            'earnPassivePerSec': self.earn_passive_per_hour / 3600,
+            'earnPassivePerHour': self.earn_passive_per_hour,
+            'lastPassiveEarn': self.last_passive_earn,
+            'tapsRecoverPerSec': self.taps_recover_per_sec,
+        }
+
+    def daily_task(self) -> dict:
+        return {
+            'id': 'streak_days',
+            'rewardCoins': DAILY_REWARDS[self.daily_days - 1],
+            'periodicity': 'Repeatedly',
+            'rewardsByDays': [{'days': days, 'rewardCoins': reward} for days, reward in enumerate(DAILY_REWARDS, 1)],
+            'isCompleted': self.daily_completed,
+            'days': self.daily_days,
+        }
+
+    def boosts_for_buy(self) -> list[dict]:
+        return [{
+            'id': 'BoostFullAvailableTaps',
+            'price': 0,
+            'earnPerTap': 0,
+            'maxTaps': 0,
+            'cooldownSeconds': max(0, int(self.boost_last_upgrade_at + 3600 - time())),
+            'level': self.boost_level + 1,
+            'maxTapsDelta': 0,
+            'earnPerTapDelta': 0,
+            'maxLevel': self.boost_max_level,
+        }]
+
+
+class MockHamsterServer:
+    def __init__(self, latency: tuple[float, float] = (0, 0), error_rate: float = 0., rate_limit_rate: float = 0.):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+
+        self.accounts: dict[int, Account] = {}
+        self.tokens: dict[str, Account] = {}
+
+        self.requests_count = 0
+        self.injected_errors = 0
+
+        self._runner: web.AppRunner | None = None
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self.inject_faults])
+        app.router.add_post('/auth/auth-by-telegram-webapp', self.auth_by_telegram_webapp)
+        app.router.add_post('/clicker/sync', self.sync)
+        app.router.add_post('/clicker/tap', self.tap)
+        app.router.add_post('/clicker/list-tasks', self.list_tasks)
+        app.router.add_post('/clicker/check-task', self.check_task)
+        app.router.add_post('/clicker/select-exchange', self.select_exchange)
+        app.router.add_post('/clicker/boosts-for-buy', self.boosts_for_buy)
+        app.router.add_post('/clicker/buy-boost', self.buy_boost)
+        app.router.add_post('/clicker/upgrades-for-buy', self.upgrades_for_buy)
+        app.router.add_post('/clicker/buy-upgrade', self.buy_upgrade)
+
+        return app
+
+    @web.middleware
+    async def inject_faults(self, request: web.Request, handler) -> web.StreamResponse:
+        self.requests_count += 1
+
+        if self.latency[1] > 0:
+            await asyncio.sleep(delay=uniform(*self.latency))
+
+        if self.rate_limit_rate and random() < self.rate_limit_rate:
+            self.injected_errors += 1
+            return web.json_response({'error_code': 'TOO_MANY_REQUESTS'}, status=429, headers={'Retry-After': '1'})
+
+        if self.error_rate and random() < self.error_rate:
+            self.injected_errors += 1
+            return web.json_response({'error_code': 'INTERNAL_ERROR'}, status=500)
+
+        return await handler(request)
+
+    def get_account(self, request: web.Request) -> Account:
+        token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        account = self.tokens.get(token)
+
+        if account is None:
+            raise web.HTTPUnauthorized(text=json.dumps({'error_code': 'NotFound_Session'}),
+                                       content_type='application/json')
+
+        account.sync()
+
+        return account
+
+    async def auth_by_telegram_webapp(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        init_data = dict(parse_qsl(body.get('initDataRaw') or ''))
+
+        try:
+            user_id = json.loads(init_data['user'])['id']
+        except (KeyError, ValueError):
+            return web.json_response({'error_code': 'BadRequest'}, status=400)
+
+        account = self.accounts.get(user_id)
+        if account is None:
+            account = self.accounts[user_id] = Account(user_id=user_id)
+
+        token = token_hex(16)
+        self.tokens[token] = account
+
+        return web.json_response({'status': 'Ok', 'authToken': token})
+
+    async def sync(self, request: web.Request) -> web.Response:
+        account = self.get_account(request)
+
+        return web.json_response({'clickerUser': account.to_json()})
+
+    async def tap(self, request: web.Request) -> web.Response:
+        account = self.get_account(request)
+        body = await request.json()
+
+        account.tap(count=int(body.get('count', 0)))
+
+        return web.json_response({'clickerUser': account.to_json()})
+
+    async def list_tasks(self, request: web.Request) -> web.Response:
+        account = self.get_account(request)
+
+        return web.json_response({'tasks': [account.daily_task()]})
+
+    async def check_task(self, request: web.Request) -> web.Response:
+        account = self.get_account(request)
+        body = await request.json()
+
+        if body.get('taskId') != 'streak_days':
+            return web.json_response({'error_code': 'TaskNotFound'}, status=400)
+
+        if not account.daily_completed:
+            account.daily_completed = True
+            account.add_coins(coins=DAILY_REWARDS[account.daily_days - 1])
+
+        return web.json_response({'task': account.daily_task(), 'clickerUser': account.to_json()})
+
+    async def select_exchange(self, request: web.Request) -> web.Response:
+        account = self.get_account(request)
+        body = await request.json()
+
+        account.exchange_id = body.get('exchangeId')
+
+        return web.json_response({'clickerUser': account.to_json()})
+
+    async def boosts_for_buy(self, request: web.Request) -> web.Response:
+        account = self.get_account(request)
+
+        return web.json_response({'boostsForBuy': account.boosts_for_buy()})
+
+    async def buy_boost(self, request: web.Request) -> web.Response:
+        account = self.get_account(request)
+        body = await request.json()
+
+        if (body.get('boostId') != 'BoostFullAvailableTaps'
+                or account.boost_level >= account.boost_max_level
+                or time() - account.boost_last_upgrade_at < 3600):
+            return web.json_response({'error_code': 'BOOST_COOLDOWN'}, status=400)
+
+        account.boost_level += 1
+        account.boost_last_upgrade_at = int(time())
+        account.available_taps = account.max_taps
+
+        return web.json_response({'clickerUser': account.to_json(), 'boostsForBuy': account.boosts_for_buy()})
+
+    async def upgrades_for_buy(self, request: web.Request) -> web.Response:
+        account = self.get_account(request)
+
+        return web.json_response({'upgradesForBuy': list(account.upgrades.values()), 'sections': [],
+                                  'dailyCombo': {}})
+
+    async def buy_upgrade(self, request: web.Request) -> web.Response:
+        account = self.get_account(request)
+        body = await request.json()
+        upgrade = account.upgrades.get(body.get('upgradeId'))
+
+        if upgrade is None:
+            return web.json_response({'error_code': 'UPGRADE_NOT_FOUND'}, status=400)
+
+        if upgrade['price'] > account.balance_coins:
+            return web.json_response({'error_code': 'INSUFFICIENT_FUNDS'}, status=400)
+
+        account.balance_coins -= upgrade['price']
+        account.earn_passive_per_hour += upgrade['profitPerHourDelta']
+
+        upgrade['level'] += 1
+        upgrade['price'] = int(upgrade['price'] * 1.5)
+        upgrade['profitPerHourDelta'] = int(upgrade['profitPerHourDelta'] * 1.2)
+
+        return web.json_response({'clickerUser': account.to_json(),
+                                  'upgradesForBuy': list(account.upgrades.values())})
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        self._runner = web.AppRunner(self.create_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host=host, port=port).start()
+
+        host, port = self._runner.addresses[0][:2]
+
+        return f'http://{host}:{port}'
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def serve(host: str, port: int, latency: tuple[float, float], error_rate: float, rate_limit_rate: float) -> None:
+    server = MockHamsterServer(latency=latency, error_rate=error_rate, rate_limit_rate=rate_limit_rate)
+    url = await server.start(host=host, port=port)
+
+    print(f'Mock Hamster API is running on {url} (set API_URL={url})')
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Offline stand-in for the Hamster Kombat API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, nargs=2, default=[0, 0], metavar=('MIN', 'MAX'),
+                        help='Random response delay in seconds')
+    parser.add_argument('--error-rate', type=float, default=0, help='Share of requests answered with 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0, help='Share of requests answered with 429')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(host=args.host, port=args.port, latency=tuple(args.latency),
+                          error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+import json
+from time import time
+from types import SimpleNamespace
+from urllib.parse import quote, urlencode
+
+from pyrogram.raw.types import InputPeerUser
+
+
+class FakeTgClient:
+    def __init__(self, name: str, user_id: int):
+        self.name = name
+        self.user_id = user_id
+        self.proxy = None
+        self.is_connected = False
+
+    async def connect(self) -> bool:
+        self.is_connected = True
+
+        return True
+
+    async def disconnect(self) -> None:
+        self.is_connected = False
+
+    async def resolve_peer(self, peer_id: str) -> InputPeerUser:
+        return InputPeerUser(user_id=7018368922, access_hash=0)
+
+    async def invoke(self, query) -> SimpleNamespace:
+        user = json.dumps({'id': self.user_id, 'first_name': self.name, 'username': self.name,
+                           'language_code': 'en', 'allows_write_to_pm': True}, separators=(',', ':'))
+        init_data = urlencode({'query_id': f'AAF{self.user_id}', 'user': user,
+                               'auth_date': int(time()), 'hash': '0' * 64})
+
+        return SimpleNamespace(url=f'https://hamsterkombat.io/#tgWebAppData={quote(init_data, safe="")}'
+                                   f'&tgWebAppVersion=7.2&tgWebAppPlatform=android')
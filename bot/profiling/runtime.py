@@ -0,0 +1,214 @@
+import os
+import io
+import signal
+import asyncio
+import cProfile
+import pstats
+import tracemalloc
+from collections import Counter
+from contextlib import suppress
+from contextvars import ContextVar
+from time import perf_counter, strftime
+
+from bot.config import settings, current_account
+from bot.utils import logger
+from bot.utils.metrics import metrics
+
+current_stage: ContextVar[str | None] = ContextVar('current_stage', default=None)
+
+
+class StageProfile:
+    __slots__ = ('profile', 'callbacks', 'busy', 'memory')
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.callbacks = 0
+        self.busy = 0.
+        self.memory = 0
+
+
+def format_stack(task: asyncio.Task, limit: int) -> str:
+    frames = task.get_stack(limit=limit)
+
+    if not frames:
+        return f"    {task.get_coro()!r}"
+
+    return '\n'.join(f"    {frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+                     for frame in frames)
+
+
+class RuntimeProfiler:
+    def __init__(self):
+        self.running = False
+
+        self._stages: dict[str, StageProfile] = {}
+        self._slow_callbacks: list[tuple[float, str, str | None, str]] = []
+        self._task: asyncio.Task | None = None
+
+    def _wrap(self, run, threshold: float):
+        stages = self._stages
+        slow_callbacks = self._slow_callbacks
+
+        def _run(handle: asyncio.Handle) -> None:
+            stage = handle._context.get(current_stage) or 'other'
+            stage_profile = stages.get(stage)
+
+            if stage_profile is None:
+                stage_profile = stages[stage] = StageProfile()
+
+            memory = tracemalloc.get_traced_memory()[0]
+            started_at = perf_counter()
+            stage_profile.profile.enable()
+
+            try:
+                run(handle)
+            finally:
+                stage_profile.profile.disable()
+                elapsed = perf_counter() - started_at
+
+                stage_profile.callbacks += 1
+                stage_profile.busy += elapsed
+                stage_profile.memory += tracemalloc.get_traced_memory()[0] - memory
+
+                if elapsed >= threshold:
+                    session_name = handle._context.get(current_account)
+                    slow_callbacks.append((elapsed, stage, session_name, repr(handle)))
+                    logger.warning(f"{session_name or 'loop'} | Slow callback in {stage} stage: "
+                                   f"{elapsed * 1000:.0f} ms | {handle!r}")
+
+        return _run
+
+    async def run(self, duration: float) -> dict:
+        if self.running:
+            raise RuntimeError("Profiling is already running")
+
+        self._stages.clear()
+        self._slow_callbacks.clear()
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(settings.PROFILE_TRACEMALLOC_FRAMES)
+
+        self.running = True
+        original_run = asyncio.Handle._run
+        asyncio.Handle._run = self._wrap(run=original_run, threshold=settings.PROFILE_SLOW_CALLBACK)
+        stage_totals = metrics.stage_latency.totals()
+
+        logger.info(f"Profiling started for {duration}s")
+        started_at = perf_counter()
+
+        try:
+            await asyncio.sleep(delay=duration)
+        finally:
+            asyncio.Handle._run = original_run
+            elapsed = perf_counter() - started_at
+            snapshot = tracemalloc.take_snapshot()
+
+            if started_tracing:
+                tracemalloc.stop()
+
+            self.running = False
+
+        steps = {labels[0]: (count - stage_totals.get(labels, (0, 0.))[0],
+                             total - stage_totals.get(labels, (0, 0.))[1])
+                 for labels, (count, total) in metrics.stage_latency.totals().items()}
+
+        return self.save(elapsed=elapsed, steps=steps, snapshot=snapshot)
+
+    def save(self, elapsed: float, steps: dict[str, tuple[int, float]], snapshot: tracemalloc.Snapshot) -> dict:
+        top = settings.PROFILE_TOP
+        path = os.path.join(settings.PROFILE_DIR, f"profile-{strftime('%Y%m%d-%H%M%S')}")
+
+        if settings.PROFILE_DIR:
+            os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+
+        stages = {}
+        rows = [f"Runtime profile | {elapsed:.1f}s | {len(asyncio.all_tasks())} tasks", '',
+                f"    {'Stage':<14} {'Steps':>8} {'Step time':>12} {'Callbacks':>10} {'Busy':>12} {'Memory':>12}"]
+
+        for stage in sorted(self._stages.keys() | steps.keys()):
+            stage_profile = self._stages.get(stage) or StageProfile()
+            step_count, step_time = steps.get(stage, (0, 0.))
+
+            if not step_count and not stage_profile.callbacks:
+                continue
+
+            stages[stage] = {
+                'steps': step_count,
+                'step_time_ms': round(step_time * 1000, 1),
+                'callbacks': stage_profile.callbacks,
+                'busy_ms': round(stage_profile.busy * 1000, 1),
+                'memory_kb': round(stage_profile.memory / 1024, 1),
+            }
+            rows.append(f"    {stage:<14} {step_count:>8} {step_time * 1000:>9.1f} ms {stage_profile.callbacks:>10} "
+                        f"{stage_profile.busy * 1000:>9.1f} ms {stage_profile.memory / 1024:>9.1f} KB")
+
+        rows += ['', f"Slow callbacks (>= {settings.PROFILE_SLOW_CALLBACK * 1000:.0f} ms): {len(self._slow_callbacks)}"]
+        for elapsed_callback, stage, session_name, callback in sorted(self._slow_callbacks, reverse=True)[:top]:
+            rows.append(f"    {elapsed_callback * 1000:>9.1f} ms | {stage} | {session_name or '-'} | {callback}")
+
+        combined = None
+
+        for stage, stage_profile in sorted(self._stages.items(), key=lambda item: item[1].busy, reverse=True):
+            if not stage_profile.callbacks:
+                continue
+
+            buffer = io.StringIO()
+            stats = pstats.Stats(stage_profile.profile, stream=buffer)
+            stats.sort_stats('cumulative').print_stats(top)
+            rows += ['', f"Stage {stage} | top {top} functions by cumulative time", buffer.getvalue().strip()]
+
+            if combined is None:
+                combined = pstats.Stats(stage_profile.profile)
+            else:
+                combined.add(stage_profile.profile)
+
+        if combined is not None:
+            combined.dump_stats(f'{path}.prof')
+
+        rows += ['', f"Top {top} allocations"]
+        for statistic in snapshot.statistics('lineno')[:top]:
+            rows.append(f"    {statistic}")
+
+        stacks = Counter(format_stack(task=task, limit=settings.PROFILE_STACK_DEPTH) for task in asyncio.all_tasks())
+        rows += ['', "Task stacks"]
+        for stack, count in stacks.most_common():
+            rows += [f"  {count} task(s)", stack]
+
+        with open(f'{path}.txt', 'w', encoding='utf-8') as file:
+            file.write('\n'.join(rows) + '\n')
+
+        logger.success(f"Profile saved to {path}.txt")
+
+        return {
+            'path': f'{path}.txt',
+            'pstats_path': f'{path}.prof' if combined is not None else None,
+            'duration': round(elapsed, 1),
+            'slow_callbacks': len(self._slow_callbacks),
+            'stages': stages,
+        }
+
+    async def _run_safely(self, duration: float) -> None:
+        try:
+            await self.run(duration=duration)
+        except Exception as error:
+            logger.error(f"Unknown error while profiling: {error}")
+
+    def trigger(self) -> None:
+        if self.running:
+            logger.warning("Profiling is already running")
+            return
+
+        self._task = asyncio.create_task(self._run_safely(duration=settings.PROFILE_DURATION))
+
+    def start(self) -> None:
+        with suppress(AttributeError, NotImplementedError, RuntimeError):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, self.trigger)
+
+    def close(self) -> None:
+        with suppress(AttributeError, NotImplementedError, RuntimeError):
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGUSR1)
+
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
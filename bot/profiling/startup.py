@@ -0,0 +1,115 @@
+import sys
+import atexit
+from collections import defaultdict
+from importlib.abc import Loader, MetaPathFinder
+from time import perf_counter
+
+started_at = perf_counter()
+enabled = False
+finished = False
+
+marks: list[tuple[str, float]] = []
+import_times: dict[str, float] = {}
+_children: list[float] = []
+
+
+class TimedLoader(Loader):
+    def __init__(self, loader: Loader, name: str):
+        self._loader = loader
+        self._name = name
+
+    def __getattr__(self, name: str):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        _children.append(0.)
+        import_started_at = perf_counter()
+
+        try:
+            self._loader.exec_module(module)
+        finally:
+            elapsed = perf_counter() - import_started_at
+            import_times[self._name] = elapsed - _children.pop()
+
+            if _children:
+                _children[-1] += elapsed
+
+
+class ImportTimer(MetaPathFinder):
+    def find_spec(self, fullname: str, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = TimedLoader(loader=spec.loader, name=fullname)
+
+        return spec
+
+
+def enable() -> None:
+    global enabled
+
+    if enabled:
+        return
+
+    enabled = True
+    sys.meta_path.insert(0, ImportTimer())
+    atexit.register(finish, name='exit')
+
+
+def mark(name: str) -> None:
+    if enabled and not finished:
+        marks.append((name, perf_counter()))
+
+
+def finish(name: str) -> None:
+    global finished
+
+    if not enabled or finished:
+        return
+
+    mark(name=name)
+    finished = True
+
+    sys.meta_path[:] = [finder for finder in sys.meta_path if not isinstance(finder, ImportTimer)]
+    sys.stderr.write(report())
+    sys.stderr.flush()
+
+
+def group_name(module_name: str) -> str:
+    parts = module_name.split('.')
+
+    return '.'.join(parts[:3]) if parts[0] == 'bot' else parts[0]
+
+
+def report(limit: int = 15) -> str:
+    rows = ['', 'Startup profile', f"    {'Phase':<28} {'At':>10} {'Took':>10}"]
+    previous = started_at
+
+    for name, marked_at in marks:
+        rows.append(f"    {name:<28} {(marked_at - started_at) * 1000:>7.0f} ms {(marked_at - previous) * 1000:>7.0f} ms")
+        previous = marked_at
+
+    packages = defaultdict(float)
+    for module_name, elapsed in import_times.items():
+        packages[group_name(module_name=module_name)] += elapsed
+
+    rows += ['', f"    {'Imports (self time)':<40} {'Took':>10}"]
+
+    for package, elapsed in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]:
+        rows.append(f"    {package:<40} {elapsed * 1000:>7.0f} ms")
+
+    rows.append(f"    {f'total ({len(import_times)} modules)':<40} {sum(import_times.values()) * 1000:>7.0f} ms")
+
+    return '\n'.join(rows) + '\n\n'
@@ -0,0 +1,85 @@
+from aiohttp import web
+
+from bot.config import settings
+
+from bot.core.supervisor import AccountSupervisor
+from bot.profiling.runtime import RuntimeProfiler
+
+supervisor_key = web.AppKey('supervisor', AccountSupervisor)
+profiler_key = web.AppKey('profiler', RuntimeProfiler)
+
+ACTIONS = ('pause', 'resume', 'drain')
+
+
+async def handle_accounts(request: web.Request) -> web.Response:
+    return web.json_response(request.app[supervisor_key].describe())
+
+
+async def handle_account(request: web.Request) -> web.Response:
+    account = request.app[supervisor_key].accounts.get(request.match_info['session_name'])
+
+    if account is None:
+        raise web.HTTPNotFound(text='Unknown session')
+
+    return web.json_response(account.describe())
+
+
+async def handle_account_action(request: web.Request) -> web.Response:
+    supervisor = request.app[supervisor_key]
+    session_name = request.match_info['session_name']
+    action = request.match_info['action']
+
+    if action not in ACTIONS:
+        raise web.HTTPNotFound(text='Unknown action')
+
+    if session_name not in supervisor.accounts:
+        raise web.HTTPNotFound(text='Unknown session')
+
+    getattr(supervisor, action)(session_name=session_name)
+
+    return web.json_response(supervisor.accounts[session_name].describe())
+
+
+async def handle_fleet_action(request: web.Request) -> web.Response:
+    supervisor = request.app[supervisor_key]
+    action = request.match_info['action']
+
+    if action not in ACTIONS:
+        raise web.HTTPNotFound(text='Unknown action')
+
+    for session_name in list(supervisor.accounts):
+        getattr(supervisor, action)(session_name=session_name)
+
+    return web.json_response({'action': action, 'accounts': len(supervisor.accounts)})
+
+
+async def handle_profile(request: web.Request) -> web.Response:
+    profiler = request.app[profiler_key]
+
+    try:
+        duration = float(request.query.get('duration', settings.PROFILE_DURATION))
+    except ValueError:
+        raise web.HTTPBadRequest(text='Duration must be a number')
+
+    if profiler.running:
+        raise web.HTTPConflict(text='Profiling is already running')
+
+    return web.json_response(await profiler.run(duration=duration))
+
+
+async def start_control_server(supervisor: AccountSupervisor, profiler: RuntimeProfiler,
+                               host: str, port: int) -> web.AppRunner:
+    app = web.Application()
+    app[supervisor_key] = supervisor
+    app[profiler_key] = profiler
+    app.router.add_get('/accounts', handle_accounts)
+    app.router.add_get('/accounts/{session_name}', handle_account)
+    app.router.add_post('/accounts/{session_name}/{action}', handle_account_action)
+    app.router.add_post('/profile', handle_profile)
+    app.router.add_post('/{action}', handle_fleet_action)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host=host, port=port).start()
+
+    return runner
@@ -2,15 +2,15 @@ import os
 import glob
 import asyncio
 import argparse
-from itertools import cycle
-
-from pyrogram import Client
-from better_proxy import Proxy
+from typing import TYPE_CHECKING, Callable
 
 from bot.config import settings
 from bot.utils import logger
-from bot.core.tapper import run_tapper
-from bot.core.registrator import register_sessions
+from bot.utils.logger import setup_logger
+from bot.profiling import startup as startup_profile
+
+if TYPE_CHECKING:
+    from pyrogram import Client
 
 
 start_text = """
@@ -23,6 +23,7 @@ Select an action:
 
     1. Create session
     2. Run clicker
+    3. Check sessions
 """
 
 
@@ -33,8 +34,10 @@ def get_session_names() -> list[str]:
     return session_names
 
 
-def get_proxies() -> list[Proxy]:
+def get_proxies() -> list[str]:
     if settings.USE_PROXY_FROM_FILE:
+        from better_proxy import Proxy
+
         with open(file='bot/config/proxies.txt', encoding='utf-8-sig') as file:
             proxies = [Proxy.from_str(proxy=row.strip()).as_url for row in file]
     else:
@@ -43,33 +46,35 @@ def get_proxies() -> list[Proxy]:
     return proxies
 
 
-async def get_tg_clients() -> list[Client]:
-    session_names = get_session_names()
-
-    if not session_names:
-        raise FileNotFoundError("Not found session files")
-
-    if not settings.API_ID or not settings.API_HASH:
-        raise ValueError("API_ID and API_HASH not found in the .env file.")
+def get_tg_client(session_name: str) -> 'Client':
+    from pyrogram import Client
 
-    tg_clients = [Client(
+    tg_client = Client(
         name=session_name,
         api_id=settings.API_ID,
         api_hash=settings.API_HASH,
         workdir='sessions/',
         plugins=dict(root='bot/plugins')
-    ) for session_name in session_names]
+    )
 
-    return tg_clients
+    return tg_client
 
 
 async def process() -> None:
+    setup_logger()
+
     parser = argparse.ArgumentParser()
     parser.add_argument('-a', '--action', type=int, help='Action to perform')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='Number of worker processes')
+    parser.add_argument('-m', '--manifest', help='File with "session_name:phone_number[:2fa_password]" rows '
+                                                 'to register in batch with action 1')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Print an import and startup time breakdown when the first request is sent')
 
     logger.info(f"Detected {len(get_session_names())} sessions | {len(get_proxies())} proxies")
 
-    action = parser.parse_args().action
+    args = parser.parse_args()
+    action = args.action
 
     if not action:
         print(start_text)
@@ -79,24 +84,174 @@ async def process() -> None:
 
             if not action.isdigit():
                 logger.warning("Action must be number")
-            elif action not in ['1', '2']:
-                logger.warning("Action must be 1 or 2")
+            elif action not in ['1', '2', '3']:
+                logger.warning("Action must be 1, 2 or 3")
             else:
                 action = int(action)
                 break
 
-    if action == 1:
+    if action == 1 and args.manifest:
+        from bot.core.registrator import check_sessions
+
+        await check_sessions(session_names=get_session_names(), proxies=get_proxies(), manifest_path=args.manifest)
+    elif action == 1:
+        from bot.core.registrator import register_sessions
+
         await register_sessions()
     elif action == 2:
-        tg_clients = await get_tg_clients()
+        from bot.core.sessions import SessionReport, preflight
+
+        if settings.SESSION_PREFLIGHT:
+            session_names = await preflight(session_names=get_session_names(), proxies=get_proxies())
+        else:
+            session_names = SessionReport(path=settings.SESSIONS_REPORT_PATH).filter_valid(
+                session_names=get_session_names())
+
+        if args.workers > 1:
+            from bot.utils.workers import run_workers
+
+            await run_workers(session_names=session_names, proxies=get_proxies(), workers=args.workers)
+        else:
+            await run_tasks(session_names=session_names)
+    elif action == 3:
+        from bot.core.registrator import check_sessions
+
+        await check_sessions(session_names=get_session_names(), proxies=get_proxies())
+
+
+async def run_tasks(session_names: list[str], proxies: list[str | None] | None = None,
+                    metrics_port: int | None = None, control_port: int | None = None,
+                    session_filter: Callable[[str], bool] | None = None):
+    if not session_names:
+        raise FileNotFoundError("Not found session files")
+
+    if not settings.API_ID or not settings.API_HASH:
+        raise ValueError("API_ID and API_HASH not found in the .env file.")
+
+    if proxies is None:
+        proxies = get_proxies()
+
+    from bot.core.tapper import Tapper
+    from bot.core.runner import AccountRunner
+    from bot.core.http_pool import HttpClientPool
+    from bot.core.scheduler import Scheduler
+    from bot.core.retry import RetryPolicy
+    from bot.core.proxy_pool import ProxyPool
+    from bot.core.checkpoint import CheckpointStore, Checkpointer
+    from bot.core.auth_cache import AuthCache
+    from bot.core.startup import StartupPipeline
+    from bot.core.tg_client import LazyTgClient, TgConnectionPool
+    from bot.core.settings_watcher import SettingsWatcher
+    from bot.core.supervisor import AccountSupervisor
+    from bot.profiling.runtime import RuntimeProfiler
+    from bot.utils.metrics import start_metrics_server, monitor_event_loop
+
+    startup_profile.mark(name='core imported')
+
+    auth_cache = AuthCache(path=settings.AUTH_CACHE_PATH)
+    startup = StartupPipeline(total=len(session_names),
+                              concurrency=settings.STARTUP_CONCURRENCY,
+                              ramp_rate=settings.STARTUP_RAMP_RATE,
+                              timeout=settings.STARTUP_TIMEOUT)
+    retry_policy = RetryPolicy()
+    checkpoint_store = CheckpointStore(path=settings.CHECKPOINT_PATH)
+    checkpoints = checkpoint_store.load_all(max_age=settings.CHECKPOINT_MAX_AGE)
+    startup_profile.mark(name='caches opened')
+
+    if metrics_port is None:
+        metrics_port = settings.METRICS_PORT
+
+    if control_port is None:
+        control_port = settings.CONTROL_PORT
+
+    loop_monitor = asyncio.create_task(monitor_event_loop())
+    settings_watcher = SettingsWatcher(interval=settings.SETTINGS_WATCH_INTERVAL)
+    settings_watcher.start()
+    profiler = RuntimeProfiler()
+    profiler.start()
+    metrics_runner = None
+    control_runner = None
+
+    if metrics_port:
+        metrics_runner = await start_metrics_server(host=settings.METRICS_HOST, port=metrics_port)
+        logger.info(f"Metrics available on http://{settings.METRICS_HOST}:{metrics_port}/metrics")
+
+    try:
+        async with (HttpClientPool() as http_pool,
+                    Scheduler() as scheduler,
+                    TgConnectionPool(max_connections=settings.TG_MAX_CONNECTIONS,
+                                     idle_connections=settings.TG_IDLE_CONNECTIONS,
+                                     idle_timeout=settings.TG_IDLE_TIMEOUT) as tg_pool):
+            proxy_pool = ProxyPool(proxies=proxies, http_pool=http_pool)
+            await proxy_pool.start()
+
+            for session_name in session_names:
+                proxy_pool.assign(session_name=session_name)
+
+            proxy_pool.summary()
+            startup_profile.mark(name='proxies checked')
+
+            def create_tapper(session_name: str) -> Tapper:
+                tapper = Tapper(tg_client=LazyTgClient(name=session_name, factory=get_tg_client), tg_pool=tg_pool,
+                                http_pool=http_pool, scheduler=scheduler, auth_cache=auth_cache, startup=startup,
+                                retry_policy=retry_policy, proxy_pool=proxy_pool)
+                checkpoint = checkpoints.get(session_name)
+
+                if checkpoint is not None:
+                    tapper.restore(checkpoint=checkpoint)
+
+                return tapper
+
+            if settings.ACCOUNT_WORKERS > 0:
+                supervisor = None
+                tappers = [create_tapper(session_name=session_name) for session_name in session_names]
+            else:
+                supervisor = AccountSupervisor(create_tapper=create_tapper, list_sessions=get_session_names,
+                                               proxy_pool=proxy_pool, startup=startup,
+                                               interval=settings.SESSIONS_WATCH_INTERVAL,
+                                               session_filter=session_filter)
+                tappers = supervisor.tappers.values()
+
+            if checkpoints:
+                logger.info(f"Loaded {len(checkpoints)} checkpoints")
+
+            startup_profile.mark(name='accounts created')
+
+            checkpointer = Checkpointer(store=checkpoint_store, tappers=tappers,
+                                        interval=settings.CHECKPOINT_INTERVAL)
+            checkpoint_task = (asyncio.create_task(checkpointer.run())
+                               if settings.CHECKPOINT_INTERVAL > 0 else None)
+
+            try:
+                if supervisor is None:
+                    runner = AccountRunner(scheduler=scheduler, startup=startup, workers=settings.ACCOUNT_WORKERS)
+
+                    await runner.run(accounts=[(tapper, proxy_pool.assign(session_name=tapper.session_name))
+                                               for tapper in tappers])
+                else:
+                    if control_port:
+                        from bot.utils.control import start_control_server
+
+                        control_runner = await start_control_server(supervisor=supervisor, profiler=profiler,
+                                                                    host=settings.CONTROL_HOST, port=control_port)
+                        logger.info(f"Control API available on http://{settings.CONTROL_HOST}:{control_port}")
 
-        await run_tasks(tg_clients=tg_clients)
+                    await supervisor.run(session_names=session_names)
+            finally:
+                if checkpoint_task is not None:
+                    checkpoint_task.cancel()
 
+                checkpointer.save()
+                proxy_pool.close()
+    finally:
+        loop_monitor.cancel()
+        settings_watcher.close()
+        profiler.close()
+        auth_cache.close()
+        checkpoint_store.close()
 
-async def run_tasks(tg_clients: list[Client]):
-    proxies = get_proxies()
-    proxies_cycle = cycle(proxies) if proxies else None
-    tasks = [asyncio.create_task(run_tapper(tg_client=tg_client, proxy=next(proxies_cycle) if proxies_cycle else None))
-             for tg_client in tg_clients]
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
 
-    await asyncio.gather(*tasks)
+        if control_runner is not None:
+            await control_runner.cleanup()
@@ -1,10 +1,151 @@
+import os
 import sys
+import json
+import queue
+import atexit
+import threading
+from itertools import count
+from typing import Callable
+
 from loguru import logger
 
+from bot.config import settings
+
+
+class QueuedSink:
+    def __init__(self, write: Callable[[list], None], max_size: int, batch_size: int):
+        self._write = write
+        self._batch_size = batch_size
+        self._queue = queue.Queue(maxsize=max_size)
+        self._stopped = threading.Event()
+
+        self.dropped = 0
+
+        self._thread = threading.Thread(target=self._drain, name='log-writer', daemon=True)
+        self._thread.start()
+
+    def put(self, item) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self) -> None:
+        while not (self._stopped.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._write(batch)
+            except Exception as error:
+                sys.stderr.write(f"Log writer error: {error}\n")
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join(timeout=5)
+
+
+class MessageSampler:
+    def __init__(self, patterns: list[str], every: int, max_level: str):
+        self.every = every
+        self.max_level_no = logger.level(max_level).no
+
+        self._counters = {pattern: count() for pattern in patterns}
+
+    def __call__(self, record) -> bool:
+        if self.every <= 1 or record['level'].no > self.max_level_no:
+            return True
+
+        for pattern, counter in self._counters.items():
+            if pattern in record['message']:
+                return next(counter) % self.every == 0
+
+        return True
+
+
+def write_console(messages: list[str]) -> None:
+    sys.stdout.write(''.join(messages))
+    sys.stdout.flush()
+
+
+def create_json_writer(path: str) -> Callable[[list], None]:
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    file = open(path, 'a', encoding='utf-8')
+    atexit.register(file.close)
+
+    def write_json(records: list[tuple]) -> None:
+        file.write(''.join(json.dumps({'time': time, 'level': level, 'line': line, 'message': message},
+                                      ensure_ascii=False) + '\n'
+                           for time, level, line, message in records))
+        file.flush()
+
+    return write_json
+
+
+def create_sampler() -> MessageSampler:
+    return MessageSampler(patterns=settings.LOG_SAMPLED_MESSAGES,
+                          every=settings.LOG_SAMPLE_EVERY,
+                          max_level=settings.LOG_SAMPLE_MAX_LEVEL)
+
+
+def dropped_records() -> int:
+    return sum(sink.dropped for sink in queued_sinks)
+
+
+queued_sinks: list[QueuedSink] = []
+configured = False
+
+console_format = ("<white>{time:YYYY-MM-DD HH:mm:ss}</white>"
+                  " | <level>{level: <8}</level>"
+                  " | <cyan><b>{line}</b></cyan>"
+                  " - <white><b>{message}</b></white>")
+
+
+def setup_logger() -> None:
+    global configured
+
+    if configured:
+        return
+
+    configured = True
+    logger.remove()
+
+    if settings.LOG_MODE == 'async':
+        console_sink = QueuedSink(write=write_console, max_size=settings.LOG_QUEUE_SIZE,
+                                  batch_size=settings.LOG_BATCH_SIZE)
+        queued_sinks.append(console_sink)
+
+        logger.add(sink=console_sink.put, format=console_format, filter=create_sampler(),
+                   colorize=sys.stdout.isatty())
+    else:
+        logger.add(sink=sys.stdout, format=console_format, filter=create_sampler())
+
+    if settings.LOG_JSON_FILE:
+        json_sink = QueuedSink(write=create_json_writer(path=settings.LOG_JSON_FILE),
+                               max_size=settings.LOG_QUEUE_SIZE, batch_size=settings.LOG_BATCH_SIZE)
+        queued_sinks.append(json_sink)
+
+        logger.add(sink=lambda message: json_sink.put((message.record['time'].isoformat(),
+                                                       message.record['level'].name,
+                                                       message.record['line'],
+                                                       message.record['message'])),
+                   format='{message}', filter=create_sampler(), colorize=False)
+
+    for queued_sink in queued_sinks:
+        atexit.register(queued_sink.stop)
+
 
 logger.remove()
-logger.add(sink=sys.stdout, format="<white>{time:YYYY-MM-DD HH:mm:ss}</white>"
-                                   " | <level>{level: <8}</level>"
-                                   " | <cyan><b>{line}</b></cyan>"
-                                   " - <white><b>{message}</b></white>")
+logger.add(sink=sys.stdout, format=console_format)
+
 logger = logger.opt(colors=True)
@@ -0,0 +1,152 @@
+import asyncio
+from bisect import bisect_left
+from collections import defaultdict
+from time import monotonic
+
+from aiohttp import web
+
+from bot.utils.logger import dropped_records
+
+
+def escape_label_value(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labelnames: tuple[str, ...], labels: tuple[str, ...], **extra) -> str:
+    pairs = list(zip(labelnames, labels)) + list(extra.items())
+
+    if not pairs:
+        return ''
+
+    return '{' + ','.join(f'{name}="{escape_label_value(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+        self._values: dict[tuple[str, ...], float] = defaultdict(float)
+
+    def inc(self, *labels: str, value: float = 1.) -> None:
+        self._values[labels] += value
+
+    def render(self) -> list[str]:
+        return [f'{self.name}{format_labels(self.labelnames, labels)} {value}'
+                for labels, value in list(self._values.items())]
+
+
+class Gauge(Counter):
+    type = 'gauge'
+
+    def set(self, *labels: str, value: float) -> None:
+        self._values[labels] = value
+
+    def remove(self, *labels: str) -> None:
+        self._values.pop(labels, None)
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = defaultdict(float)
+
+    def observe(self, *labels: str, value: float) -> None:
+        counts = self._counts.get(labels)
+
+        if counts is None:
+            counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def totals(self) -> dict[tuple[str, ...], tuple[int, float]]:
+        return {labels: (sum(counts), self._sums[labels]) for labels, counts in self._counts.items()}
+
+    def render(self) -> list[str]:
+        lines = []
+
+        for labels, counts in list(self._counts.items()):
+            cumulative = 0
+
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{format_labels(self.labelnames, labels, le=bound)} {cumulative}')
+
+            lines.append(f'{self.name}_sum{format_labels(self.labelnames, labels)} {self._sums[labels]}')
+            lines.append(f'{self.name}_count{format_labels(self.labelnames, labels)} {cumulative}')
+
+        return lines
+
+
+class Metrics:
+    def __init__(self):
+        self.requests = Counter('hamster_api_requests_total', 'API requests by endpoint and HTTP status',
+                                ('endpoint', 'status'))
+        self.request_errors = Counter('hamster_api_errors_total', 'API request errors by endpoint and exception class',
+                                      ('endpoint', 'error'))
+        self.request_latency = Histogram('hamster_api_request_duration_seconds', 'API request latency',
+                                         ('endpoint',))
+        self.tg_connections = Gauge('hamster_tg_connections', 'Open MTProto connections by state', ('state',))
+        self.stage_latency = Histogram('hamster_stage_duration_seconds', 'Tapper stage duration', ('stage',))
+        self.cache_requests = Counter('hamster_response_cache_requests_total', 'Response cache lookups',
+                                      ('key', 'result'))
+        self.circuit_open = Gauge('hamster_circuit_breaker_open', 'Whether the API circuit breaker is open', ('host',))
+
+        self.balance = Gauge('hamster_account_balance_coins', 'Account balance', ('session',))
+        self.energy = Gauge('hamster_account_available_taps', 'Account available energy', ('session',))
+        self.passive_income = Gauge('hamster_account_passive_per_hour', 'Account passive income per hour',
+                                    ('session',))
+
+        self.event_loop_lag = Gauge('hamster_event_loop_lag_seconds', 'Event loop scheduling delay')
+        self.tasks = Gauge('hamster_asyncio_tasks', 'Number of asyncio tasks')
+        self.log_dropped = Gauge('hamster_log_dropped_records', 'Log records dropped because the log queue was full')
+
+    def render(self) -> str:
+        lines = []
+
+        for metric in vars(self).values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(metric.render())
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+async def monitor_event_loop(interval: float = 1.) -> None:
+    while True:
+        started_at = monotonic()
+        await asyncio.sleep(delay=interval)
+
+        metrics.event_loop_lag.set(value=max(monotonic() - started_at - interval, 0))
+        metrics.tasks.set(value=len(asyncio.all_tasks()))
+        metrics.log_dropped.set(value=dropped_records())
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(body=metrics.render().encode(), headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    app = web.Application()
+    app.router.add_get('/metrics', handle_metrics)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host=host, port=port).start()
+
+    return runner
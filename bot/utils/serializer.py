@@ -0,0 +1,22 @@
+import json
+
+from bot.config import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None and settings.USE_ORJSON:
+    name = 'orjson'
+
+    dumps = orjson.dumps
+    loads = orjson.loads
+else:
+    name = 'json'
+
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+
+    loads = json.loads
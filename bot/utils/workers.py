@@ -0,0 +1,141 @@
+import os
+import queue
+import asyncio
+import hashlib
+import multiprocessing
+from itertools import cycle
+from contextlib import suppress
+from time import time
+
+from bot.config import settings
+from bot.utils import logger
+from bot.utils.logger import setup_logger
+
+
+def get_worker_id(session_name: str, workers: int) -> int:
+    return int(hashlib.sha1(session_name.encode()).hexdigest(), 16) % workers
+
+
+def split_sessions(session_names: list[str], proxies: list[str], workers: int) -> list[list[tuple[str, str | None]]]:
+    proxies_cycle = cycle(proxies) if proxies else None
+    shards = [[] for _ in range(workers)]
+
+    for session_name in sorted(session_names):
+        proxy = next(proxies_cycle) if proxies_cycle else None
+        shards[get_worker_id(session_name=session_name, workers=workers)].append((session_name, proxy))
+
+    return shards
+
+
+async def report_status(worker_id: int, status_queue: multiprocessing.Queue, sessions_count: int) -> None:
+    while True:
+        status_queue.put((worker_id, os.getpid(), sessions_count, len(asyncio.all_tasks()), time()))
+        await asyncio.sleep(delay=settings.WORKERS_STATUS_INTERVAL)
+
+
+async def run_worker(worker_id: int, workers: int, accounts: list[tuple[str, str | None]],
+                     status_queue: multiprocessing.Queue) -> None:
+    from bot.utils.launcher import run_tasks
+
+    reporter = asyncio.create_task(report_status(worker_id=worker_id, status_queue=status_queue,
+                                                 sessions_count=len(accounts)))
+
+    try:
+        await run_tasks(session_names=[session_name for session_name, _ in accounts],
+                        proxies=[proxy for _, proxy in accounts],
+                        metrics_port=settings.METRICS_PORT + 1 + worker_id if settings.METRICS_PORT else 0,
+                        control_port=settings.CONTROL_PORT + 1 + worker_id if settings.CONTROL_PORT else 0,
+                        session_filter=lambda session_name: get_worker_id(session_name=session_name,
+                                                                          workers=workers) == worker_id)
+    finally:
+        reporter.cancel()
+
+
+def worker_main(worker_id: int, workers: int, accounts: list[tuple[str, str | None]],
+                status_queue: multiprocessing.Queue) -> None:
+    setup_logger()
+
+    with suppress(KeyboardInterrupt):
+        asyncio.run(run_worker(worker_id=worker_id, workers=workers, accounts=accounts, status_queue=status_queue))
+
+
+async def run_workers(session_names: list[str], proxies: list[str], workers: int) -> None:
+    if not session_names:
+        raise FileNotFoundError("Not found session files")
+
+    context = multiprocessing.get_context('spawn')
+    status_queue = context.Queue()
+    shards = split_sessions(session_names=session_names, proxies=proxies, workers=workers)
+
+    processes: dict[int, multiprocessing.Process] = {}
+    statuses: dict[int, tuple] = {}
+    crashes = dict.fromkeys(range(workers), 0)
+    restart_at: dict[int, float] = {}
+    started_at: dict[int, float] = {}
+    restarts = 0
+
+    def start_worker(worker_id: int) -> None:
+        process = context.Process(target=worker_main, args=(worker_id, workers, shards[worker_id], status_queue),
+                                  name=f'worker-{worker_id}', daemon=True)
+        process.start()
+
+        processes[worker_id] = process
+        started_at[worker_id] = time()
+
+        logger.info(f"Worker <m>{worker_id}</m> started | PID: {process.pid} | Sessions: {len(shards[worker_id])}")
+
+    for worker_id, shard in enumerate(shards):
+        if shard:
+            start_worker(worker_id=worker_id)
+
+    last_report = time()
+
+    try:
+        while True:
+            await asyncio.sleep(delay=1)
+
+            with suppress(queue.Empty):
+                while True:
+                    status = status_queue.get_nowait()
+                    statuses[status[0]] = status
+
+            for worker_id, process in processes.items():
+                if process.is_alive() or worker_id in restart_at:
+                    continue
+
+                if time() - started_at[worker_id] > 60:
+                    crashes[worker_id] = 0
+
+                crashes[worker_id] += 1
+                restart_delay = min(2 ** crashes[worker_id], 60)
+                restart_at[worker_id] = time() + restart_delay
+                statuses.pop(worker_id, None)
+
+                logger.warning(f"Worker <m>{worker_id}</m> exited with code {process.exitcode} | "
+                               f"Restart in {restart_delay}s")
+
+            for worker_id, start_time in list(restart_at.items()):
+                if time() >= start_time:
+                    del restart_at[worker_id]
+                    restarts += 1
+                    start_worker(worker_id=worker_id)
+
+            if time() - last_report >= settings.WORKERS_STATUS_INTERVAL:
+                last_report = time()
+
+                alive = sum(process.is_alive() for process in processes.values())
+                sessions = sum(status[2] for status in statuses.values())
+                tasks = sum(status[3] for status in statuses.values())
+                stale = [worker_id for worker_id, status in statuses.items()
+                         if time() - status[4] > settings.WORKERS_STATUS_INTERVAL * 3]
+
+                logger.info(f"Workers: <g>{alive}/{len(processes)}</g> alive | Sessions: <c>{sessions}</c> | "
+                            f"Tasks: <c>{tasks}</c> | Restarts: <y>{restarts}</y>"
+                            + (f" | Stale: <r>{stale}</r>" if stale else ""))
+    finally:
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+
+        for process in processes.values():
+            process.join(timeout=5)
@@ -1,10 +1,17 @@
+import sys
 import asyncio
 from contextlib import suppress
 
+from bot.profiling import startup as startup_profile
+
+if '--profile-startup' in sys.argv:
+    startup_profile.enable()
+
 from bot.utils.launcher import process
 
 
 async def main():
+    startup_profile.mark(name='launcher imported')
     await process()
 
 